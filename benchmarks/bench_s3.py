@@ -0,0 +1,225 @@
+"""
+Benchmark do módulo misc_crud.io.s3 contra um S3 local (moto server).
+
+Mede vazão, latência (p50/p95/p99) e pico de memória alocada (tracemalloc, em uma passada à parte) de cada método,
+variando o tamanho dos objetos, a quantidade de objetos no bucket e o chunk_size do streaming. O moto server roda em
+um processo separado, de forma que as alocações e o GIL do servidor não entram nas medições do client.
+
+    pip install "moto[server]" boto3
+    python benchmarks/bench_s3.py --tamanhos 1024 1048576 --objetos 100 1000 --repeticoes 20 --json bench_output.json
+
+O moto guarda os objetos em memória e cada cenário grava `objetos` x `tamanho` bytes; objetos grandes devem ser
+medidos em um bucket pequeno, por exemplo:
+
+    python benchmarks/bench_s3.py --tamanhos 16777216 --objetos 10
+
+Os resultados em JSON podem ser comparados entre execuções com --comparar ANTERIOR.json.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+import urllib.error
+import urllib.request
+
+import boto3
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from misc_crud.io.s3 import MultiArmazenamentoS3  # noqa: E402
+
+VOLUME = 'benchmark'
+CHUNK_SIZES = (65536, 1048576, 8388608)
+
+
+def percentil(valores: list, p: float) -> float:
+    """
+    Calcula o percentil p (0-100) por interpolação linear.
+
+    :param list valores: amostras
+    :param float p: percentil
+    :return: valor do percentil
+    :rtype: float
+    """
+    ordenados = sorted(valores)
+    if not ordenados:
+        return 0.0
+    k = (len(ordenados) - 1) * p / 100
+    i = int(k)
+    j = min(i + 1, len(ordenados) - 1)
+    return ordenados[i] + (ordenados[j] - ordenados[i]) * (k - i)
+
+
+def medir(nome: str, funcao, repeticoes: int, bytes_por_chamada: int = 0, repeticoes_memoria: int = 3,
+          **contexto) -> dict:
+    """
+    Executa `funcao` `repeticoes` vezes medindo a latência de cada chamada e, em uma passada separada de
+    `repeticoes_memoria` execuções com tracemalloc ligado, o pico de memória. Assim o overhead do tracemalloc não
+    entra nos percentis nem na vazão.
+
+    :param str nome: nome do cenário
+    :param callable funcao: função sem argumentos
+    :param int repeticoes: quantidade de execuções cronometradas
+    :param int bytes_por_chamada: bytes trafegados por chamada, para o cálculo da vazão
+    :param int repeticoes_memoria: quantidade de execuções na passada de memória
+    :return: dict com as métricas do cenário
+    :rtype: dict
+    """
+    funcao()
+    latencias = []
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        t = time.perf_counter()
+        funcao()
+        latencias.append(time.perf_counter() - t)
+    total = time.perf_counter() - inicio
+    tracemalloc.start()
+    for _ in range(max(1, min(repeticoes, repeticoes_memoria))):
+        funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'cenario': nome, **contexto, 'repeticoes': repeticoes,
+            'p50_ms': percentil(latencias, 50) * 1000, 'p95_ms': percentil(latencias, 95) * 1000,
+            'p99_ms': percentil(latencias, 99) * 1000, 'ops_s': repeticoes / total,
+            'mb_s': bytes_por_chamada * repeticoes / total / 1048576, 'pico_mb': pico / 1048576}
+
+
+def iniciar_servidor(porta: int, timeout: float = 30.0) -> subprocess.Popen:
+    """
+    Inicia o moto server em um subprocesso e aguarda até que ele responda.
+
+    :param int porta: porta do servidor
+    :param float timeout: tempo máximo de espera, em segundos
+    :return: processo do servidor
+    :rtype: subprocess.Popen
+    """
+    processo = subprocess.Popen([sys.executable, '-m', 'moto.server', '-p', str(porta)], stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL)
+    limite = time.monotonic() + timeout
+    while True:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{porta}/', timeout=1).close()
+            return processo
+        except urllib.error.HTTPError:
+            return processo
+        except OSError:
+            if processo.poll() is not None or time.monotonic() > limite:
+                processo.kill()
+                raise RuntimeError(f'moto server não iniciou na porta {porta}')
+            time.sleep(0.1)
+
+
+def consumir(iteravel):
+    for _ in iteravel:
+        pass
+
+
+def preparar_bucket(endpoint: str, quantidade: int, tamanho: int):
+    """
+    Recria o bucket com `quantidade` objetos de `tamanho` bytes.
+    """
+    client = boto3.client('s3', endpoint_url=endpoint, aws_access_key_id='bench', aws_secret_access_key='bench',
+                          region_name='us-east-1')
+    try:
+        paginador = client.get_paginator('list_objects_v2')
+        for pagina in paginador.paginate(Bucket=VOLUME):
+            chaves = [{'Key': o['Key']} for o in pagina.get('Contents', [])]
+            if chaves:
+                client.delete_objects(Bucket=VOLUME, Delete={'Objects': chaves, 'Quiet': True})
+    except client.exceptions.NoSuchBucket:
+        client.create_bucket(Bucket=VOLUME)
+    dados = os.urandom(tamanho)
+    for i in range(quantidade):
+        client.put_object(Bucket=VOLUME, Key=f'dados/{i:08d}', Body=dados)
+
+
+def executar(endpoint: str, tamanhos: list, objetos: list, repeticoes: int) -> list:
+    s3 = MultiArmazenamentoS3(access_key='bench', secret_key='bench', endpoint=endpoint, region='us-east-1',
+                              volume=VOLUME, max_pool_connections=32)
+    resultados = []
+    with tempfile.TemporaryDirectory() as diretorio:
+        arquivo = os.path.join(diretorio, 'saida')
+        for quantidade in objetos:
+            for tamanho in tamanhos:
+                preparar_bucket(endpoint, quantidade, tamanho)
+                chave = f'dados/{quantidade // 2:08d}'
+                contexto = {'objetos': quantidade, 'tamanho': tamanho}
+                resultados.append(medir('existe_objeto', lambda: s3.existe_objeto(chave), repeticoes, **contexto))
+                resultados.append(medir('listar_objetos', lambda: s3.listar_objetos(), max(1, repeticoes // 10),
+                                        **contexto))
+                resultados.append(medir('pesquisar_objeto', lambda: s3.pesquisar_objeto('0', prefixo='dados/0000'),
+                                        repeticoes, **contexto))
+                resultados.append(medir('download_bytes', lambda: s3.download_bytes(chave), repeticoes, tamanho,
+                                        **contexto))
+                resultados.append(medir('download_b64str', lambda: s3.download_b64str(chave), repeticoes, tamanho,
+                                        **contexto))
+                resultados.append(medir('download_arquivo', lambda: s3.download_arquivo(chave, arquivo), repeticoes,
+                                        tamanho, **contexto))
+                resultados.append(medir('download_paralelo', lambda: s3.download_paralelo(chave), repeticoes,
+                                        tamanho, **contexto))
+                for chunk_size in CHUNK_SIZES:
+                    resultados.append(medir('stream_objeto', lambda: consumir(s3.stream_objeto(chave, chunk_size)),
+                                            repeticoes, tamanho, chunk_size=chunk_size, **contexto))
+                dados = os.urandom(tamanho)
+                resultados.append(medir('grava_bytes', lambda: s3.grava_bytes('bench/escrita', dados), repeticoes,
+                                        tamanho, **contexto))
+                chaves = [f'dados/{i:08d}' for i in range(min(quantidade, 100))]
+                resultados.append(medir('download_lote', lambda: consumir(s3.download_lote(chaves)),
+                                        max(1, repeticoes // 10), tamanho * len(chaves), **contexto))
+    return resultados
+
+
+def imprimir(resultados: list, anteriores: list = None):
+    """
+    Imprime os resultados em forma de tabela, com a variação do p50 em relação a uma execução anterior.
+    """
+    def chave(r):
+        return (r['cenario'], r['objetos'], r['tamanho'], r.get('chunk_size'))
+
+    base = {chave(r): r for r in anteriores or []}
+    colunas = f'{"cenario":<18} {"objetos":>8} {"tamanho":>10} {"chunk":>9} {"p50_ms":>9} {"p95_ms":>9} ' \
+              f'{"p99_ms":>9} {"ops_s":>9} {"mb_s":>9} {"pico_mb":>8}'
+    print(colunas + ('   Δp50' if base else ''))
+    for r in resultados:
+        linha = f'{r["cenario"]:<18} {r["objetos"]:>8} {r["tamanho"]:>10} {r.get("chunk_size") or "":>9} ' \
+                f'{r["p50_ms"]:>9.2f} {r["p95_ms"]:>9.2f} {r["p99_ms"]:>9.2f} {r["ops_s"]:>9.1f} ' \
+                f'{r["mb_s"]:>9.1f} {r["pico_mb"]:>8.2f}'
+        anterior = base.get(chave(r))
+        if anterior and anterior['p50_ms']:
+            linha += f' {100 * (r["p50_ms"] / anterior["p50_ms"] - 1):>+6.1f}%'
+        print(linha)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[1024, 1048576])
+    parser.add_argument('--objetos', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--repeticoes', type=int, default=20)
+    parser.add_argument('--porta', type=int, default=5055)
+    parser.add_argument('--json', help='arquivo de saída com os resultados')
+    parser.add_argument('--comparar', help='arquivo JSON de uma execução anterior')
+    args = parser.parse_args()
+
+    servidor = iniciar_servidor(args.porta)
+    try:
+        resultados = executar(f'http://127.0.0.1:{args.porta}', args.tamanhos, args.objetos, args.repeticoes)
+    finally:
+        servidor.terminate()
+        servidor.wait()
+
+    anteriores = None
+    if args.comparar:
+        with open(args.comparar) as f:
+            anteriores = json.load(f)
+    imprimir(resultados, anteriores)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(resultados, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
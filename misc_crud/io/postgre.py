@@ -1,10 +1,41 @@
+import io
+import csv
+import uuid
+import queue
 import psycopg2
+import itertools
 
-from psycopg2 import OperationalError
+from threading import BoundedSemaphore, Event, Thread
+from contextlib import contextmanager
+
+from psycopg2 import OperationalError, InterfaceError
+from psycopg2.pool import ThreadedConnectionPool, PoolError
 from psycopg2.extras import DictCursor
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, connection
 
 import logging as logger
 
+from .postgre_comum import Queries, RegistroHistorico, converter_linha  # noqa: F401
+
+
+def executar_preparada(cursor, preparadas: set, nome: str, query: str, values: tuple):
+    """
+    Executa um prepared statement, preparando-o (PREPARE) na sessão do cursor na primeira vez.
+
+    :param cursor: cursor da conexão
+    :param set preparadas: nomes dos statements já preparados nesta conexão
+    :param str nome: nome do statement
+    :param str query: query com parâmetros posicionais ($1, $2...)
+    :param tuple values: parâmetros, na ordem dos posicionais
+    """
+    if nome not in preparadas:
+        cursor.execute(f'PREPARE {nome} AS {query};')
+        preparadas.add(nome)
+    if values:
+        cursor.execute(f'EXECUTE {nome} ({", ".join(["%s"] * len(values))});', values)
+    else:
+        cursor.execute(f'EXECUTE {nome};')
+
 
 class __ModPostgre:
     """
@@ -15,8 +46,10 @@ class __ModPostgre:
         try:
             self.__conexao = psycopg2.connect(database=database, user=usuario, password=senha, host=host, port=porta)
             self.__cursor = self.__conexao.cursor(cursor_factory=DictCursor)
+            self.__cursor_tupla = self.__conexao.cursor()
         except OperationalError as e:
             logger.critical(f'Falha de conexao com o banco de dados: {e}')
+        self.__preparadas = set()
 
     def __commit(self):
         self.__conexao.commit()
@@ -29,20 +62,105 @@ class __ModPostgre:
         _ = self.__cursor.fetchall()
         return (len(_), _)
 
-    def select_one(self, *, query: str, values: dict) -> tuple:
-        self.__cursor.execute(query, values)
-        return self.__cursor.fetchone()
+    def iterar(self, *, query: str, values: dict, lote: int = 1000, em_lotes: bool = False):
+        """
+        Executa um select em um cursor nomeado (server-side) e retorna os registros sob demanda, em memória
+        constante: o servidor envia `lote` registros por vez.
+
+        O cursor é WITH HOLD, de forma que a conexão pode ser usada durante a iteração (ex.: `execute`, que
+        faz commit) sem invalidá-lo. Atenção: no primeiro commit feito durante a iteração o Postgres materializa
+        todo o restante do resultado (no servidor), e a memória deixa de ser constante; para ler e escrever no
+        mesmo laço em tabelas grandes, itere em uma conexão separada (ex.: `DatabasePostgrePool.iterar`).
+
+        Uma transação pendente do chamador não é confirmada: o commit ao final só é feito quando a conexão estava
+        ociosa ao iniciar a iteração.
+
+        :param str query: query parametrizada
+        :param dict values: parâmetros
+        :param int lote: quantidade de registros por ida ao servidor (itersize/fetchmany)
+        :param bool em_lotes: retorna listas de até `lote` registros em vez de registros individuais
+        :return: iterator de registros (ou de listas de registros)
+        :rtype: iterator(DictRow)
+        """
+        ocioso = self.__conexao.info.transaction_status == TRANSACTION_STATUS_IDLE
+        cursor = self.__conexao.cursor(name=f'misc_crud_{uuid.uuid4().hex}', cursor_factory=DictCursor,
+                                       withhold=True)
+        cursor.itersize = lote
+        try:
+            cursor.execute(query, values)
+            while True:
+                registros = cursor.fetchmany(lote)
+                if not registros:
+                    break
+                if em_lotes:
+                    yield registros
+                else:
+                    yield from registros
+        finally:
+            cursor.close()
+            if ocioso:
+                self.__commit()
+
+    def select_one(self, *, query: str, values: dict, tipo_linha=None) -> tuple:
+        cursor = self.__cursor if tipo_linha is None else self.__cursor_tupla
+        cursor.execute(query, values)
+        return converter_linha(cursor.fetchone(), tipo_linha)
+
+    def select_one_preparada(self, *, nome: str, query: str, values: tuple, tipo_linha=None) -> tuple:
+        """
+        Executa um select com prepared statement (PREPARE na primeira chamada, EXECUTE nas seguintes).
+
+        :param str nome: nome do statement
+        :param str query: query com parâmetros posicionais ($1, $2...)
+        :param tuple values: parâmetros
+        :param callable tipo_linha: conversão da linha; quando informado, a linha vem de um cursor de tuplas
+        :return: linha
+        """
+        cursor = self.__cursor if tipo_linha is None else self.__cursor_tupla
+        executar_preparada(cursor, self.__preparadas, nome, query, values)
+        return converter_linha(cursor.fetchone(), tipo_linha)
+
+    def execute_preparada(self, *, nome: str, query: str, values: tuple) -> int:
+        """
+        Executa um comando com prepared statement e efetua commit.
+
+        :param str nome: nome do statement
+        :param str query: query com parâmetros posicionais ($1, $2...)
+        :param tuple values: parâmetros
+        :return: quantidade de registros afetados
+        :rtype: int
+        """
+        executar_preparada(self.__cursor, self.__preparadas, nome, query, values)
+        self.__commit()
+        return self.__rowcount()
 
     def execute(self, *, query: str, values: dict) -> int:
         self.__cursor.execute(query, values)
         self.__commit()
         return self.__rowcount()
 
+    @contextmanager
+    def transacao(self):
+        """
+        Context manager que entrega o cursor para uma sequência de comandos em uma única transação: commit ao final,
+        rollback em caso de exceção.
+
+        :return: cursor
+        :rtype: DictCursor
+        """
+        try:
+            yield self.__cursor
+            self.__commit()
+        except BaseException:
+            self.__conexao.rollback()
+            raise
+
     def __enter__(self):
         return self
 
     def __del__(self):
         self.__cursor.close()
+        self.__cursor_tupla.close()
         self.__conexao.close()
 
     def __exit__(self, type, value, traceback):
@@ -59,40 +177,255 @@ class DatabasePostgre(__ModPostgre):
         super().__init__(host=host, porta=porta, database=database, usuario=usuario, senha=senha)
 
 
-from postgre import DatabasePostgre
+class ConexaoPool(connection):
+    """
+    Conexão psycopg2 usada pelo pool, com o estado de cada conexão guardado nela mesma (e não em um dict indexado
+    por id(), que pode ser reaproveitado por uma conexão nova depois que a antiga é fechada): a quantidade de
+    empréstimos e os nomes dos prepared statements já preparados na sessão.
+    """
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.usos = 0
+        self.preparadas = set()
 
-class Queries:
+
+class __ModPostgrePool:
     """
-    Classe para abstrair as queries para lidar com dados no Postgre.
+    Classe para modelar um pool de conexões thread-safe com banco de dados Postgre (ThreadedConnectionPool).
 
-    :meta public:
+    Cada chamada pega uma conexão emprestada do pool, de forma que várias threads executam queries em paralelo.
+    No empréstimo a conexão é verificada (`SELECT 1`) e, após `max_usos` empréstimos, é descartada e reaberta.
+
+    `minimo` conexões são abertas na criação; as demais são abertas sob demanda e, ao serem devolvidas, continuam
+    abertas no pool (até `maximo`), sem reconexão a cada empréstimo.
     """
 
-    TABELA = 'HISTORICO'
+    def __init__(self, host: str, porta: int, database: str, usuario: str, senha: str, minimo: int = 1,
+                 maximo: int = 10, timeout: float = 5.0, max_usos: int = 1000, verificar: bool = True):
+        self.__pool = ThreadedConnectionPool(minimo, maximo, database=database, user=usuario, password=senha,
+                                             host=host, port=porta, connection_factory=ConexaoPool)
+        # o ThreadedConnectionPool fecha toda conexão devolvida quando já guarda `minconn` conexões livres
+        self.__pool.minconn = maximo
+        self.__vagas = BoundedSemaphore(maximo)
+        self.__TIMEOUT = timeout
+        self.__MAX_USOS = max_usos
+        self.__VERIFICAR = verificar
+
+    def __saudavel(self, conexao) -> bool:
+        if conexao.closed:
+            return False
+        if not self.__VERIFICAR:
+            return True
+        try:
+            with conexao.cursor() as cursor:
+                cursor.execute('SELECT 1;')
+            conexao.rollback()
+            return True
+        except (OperationalError, InterfaceError):
+            return False
+
+    def __devolver(self, conexao, descartar: bool = False):
+        conexao.usos += 1
+        descartar = descartar or conexao.closed or conexao.usos >= self.__MAX_USOS
+        self.__pool.putconn(conexao, close=descartar)
+        self.__vagas.release()
+
+    @contextmanager
+    def conexao(self, cursor_factory=DictCursor):
+        """
+        Context manager que empresta uma conexão do pool e entrega (conexao, cursor). Ao final do bloco é feito commit
+        (ou rollback, em caso de exceção) e a conexão é devolvida.
+
+        :param cursor_factory: classe do cursor, DictCursor por padrão
+        :return: (conexao, cursor)
+        :rtype: tuple
+        :raises: PoolError quando nenhuma conexão fica livre em `timeout` segundos
+        """
+        if not self.__vagas.acquire(timeout=self.__TIMEOUT):
+            raise PoolError(f'Nenhuma conexão livre em {self.__TIMEOUT}s')
+        try:
+            conexao = self.__pool.getconn()
+            while not self.__saudavel(conexao):
+                logger.warning('Conexão com o banco de dados inválida, reabrindo')
+                self.__pool.putconn(conexao, close=True)
+                conexao = self.__pool.getconn()
+        except Exception:
+            self.__vagas.release()
+            raise
+        descartar = False
+        try:
+            with conexao.cursor(cursor_factory=cursor_factory) as cursor:
+                yield conexao, cursor
+            conexao.commit()
+        except (OperationalError, InterfaceError):
+            descartar = True
+            raise
+        except BaseException:
+            if not conexao.closed:
+                conexao.rollback()
+            raise
+        finally:
+            self.__devolver(conexao, descartar=descartar)
+
+    def select(self, *, query: str, values: dict) -> tuple:
+        with self.conexao() as (_, cursor):
+            cursor.execute(query, values)
+            _ = cursor.fetchall()
+        return (len(_), _)
+
+    def iterar(self, *, query: str, values: dict, lote: int = 1000, em_lotes: bool = False):
+        """
+        Executa um select em um cursor nomeado (server-side) e retorna os registros sob demanda. A conexão fica
+        emprestada enquanto a iteração não termina.
+
+        :param str query: query parametrizada
+        :param dict values: parâmetros
+        :param int lote: quantidade de registros por ida ao servidor (itersize/fetchmany)
+        :param bool em_lotes: retorna listas de até `lote` registros em vez de registros individuais
+        :return: iterator de registros (ou de listas de registros)
+        :rtype: iterator(DictRow)
+        """
+        with self.conexao() as (conexao, _):
+            with conexao.cursor(name=f'misc_crud_{uuid.uuid4().hex}', cursor_factory=DictCursor) as cursor:
+                cursor.itersize = lote
+                cursor.execute(query, values)
+                while True:
+                    registros = cursor.fetchmany(lote)
+                    if not registros:
+                        break
+                    if em_lotes:
+                        yield registros
+                    else:
+                        yield from registros
+
+    def select_one(self, *, query: str, values: dict, tipo_linha=None) -> tuple:
+        with self.conexao(cursor_factory=DictCursor if tipo_linha is None else None) as (_, cursor):
+            cursor.execute(query, values)
+            return converter_linha(cursor.fetchone(), tipo_linha)
+
+    def select_one_preparada(self, *, nome: str, query: str, values: tuple, tipo_linha=None) -> tuple:
+        """
+        Executa um select com prepared statement, preparado uma vez por conexão do pool.
+
+        :param str nome: nome do statement
+        :param str query: query com parâmetros posicionais ($1, $2...)
+        :param tuple values: parâmetros
+        :param callable tipo_linha: conversão da linha; quando informado, a linha vem de um cursor de tuplas
+        :return: linha
+        """
+        with self.conexao(cursor_factory=DictCursor if tipo_linha is None else None) as (conexao, cursor):
+            executar_preparada(cursor, conexao.preparadas, nome, query, values)
+            return converter_linha(cursor.fetchone(), tipo_linha)
+
+    def execute_preparada(self, *, nome: str, query: str, values: tuple) -> int:
+        """
+        Executa um comando com prepared statement, preparado uma vez por conexão do pool.
+
+        :param str nome: nome do statement
+        :param str query: query com parâmetros posicionais ($1, $2...)
+        :param tuple values: parâmetros
+        :return: quantidade de registros afetados
+        :rtype: int
+        """
+        with self.conexao() as (conexao, cursor):
+            executar_preparada(cursor, conexao.preparadas, nome, query, values)
+            return cursor.rowcount
+
+    def execute(self, *, query: str, values: dict) -> int:
+        with self.conexao() as (_, cursor):
+            cursor.execute(query, values)
+            return cursor.rowcount
+
+    @contextmanager
+    def transacao(self):
+        """
+        Context manager que entrega o cursor de uma conexão emprestada para uma sequência de comandos em uma única
+        transação: commit ao final, rollback em caso de exceção.
+
+        :return: cursor
+        :rtype: DictCursor
+        """
+        with self.conexao() as (_, cursor):
+            yield cursor
+
+    def fechar(self):
+        """
+        Fecha todas as conexões do pool.
+        """
+        self.__pool.closeall()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.fechar()
+
+
+class DatabasePostgrePool(__ModPostgrePool):
+    def __init__(self,
+                 host: str,
+                 porta: str,
+                 database: str,
+                 usuario: str,
+                 senha: str,
+                 minimo: int = 1,
+                 maximo: int = 10,
+                 timeout: float = 5.0,
+                 max_usos: int = 1000,
+                 verificar: bool = True):
+        super().__init__(host=host, porta=porta, database=database, usuario=usuario, senha=senha, minimo=minimo,
+                         maximo=maximo, timeout=timeout, max_usos=max_usos, verificar=verificar)
 
-    COLUNAS = ['ID', 'TIMESTAMP', 'FORMATO', 'PROCESSADO']
 
-    COUNT = """SELECT * FROM "HISTORICO";"""
+class LeitorCSV:
+    """
+    Objeto file-like que serializa, sob demanda, um iterável de tuplas em CSV para o COPY ... FROM STDIN.
 
-    PUT_REG = """
-              INSERT INTO "HISTORICO" ("ID", "TIMESTAMP") VALUES (%(identificador)s, %(timestamp)s);
-              """
+    Apenas `linhas` registros são convertidos por vez, de forma que a carga não precisa caber em memória. O csv do
+    Python escreve `None` e `''` da mesma forma (campo vazio, sem aspas), portanto strings vazias chegam ao banco como
+    NULL pelo `FORMAT csv`.
+    """
 
-    UPDATE_REG = """
-                 UPDATE "HISTORICO"
-                    SET
-                        ("FORMATO", "PROCESSADO") = (%(formato)s, %(timestamp)s)
-                 WHERE "ID" = %(identificador)s;
-                 """
+    def __init__(self, registros, linhas: int = 1000):
+        self.__registros = iter(registros)
+        self.__LINHAS = linhas
+        self.__buffer = ''
+
+    def read(self, tamanho: int = -1) -> str:
+        while tamanho < 0 or len(self.__buffer) < tamanho:
+            bloco = list(itertools.islice(self.__registros, self.__LINHAS))
+            if not bloco:
+                break
+            saida = io.StringIO()
+            csv.writer(saida, lineterminator='\n').writerows(bloco)
+            self.__buffer += saida.getvalue()
+        if tamanho < 0:
+            tamanho = len(self.__buffer)
+        dados, self.__buffer = self.__buffer[:tamanho], self.__buffer[tamanho:]
+        return dados
+
+
+class EscritorFila(io.TextIOBase):
+    """
+    Objeto file-like que repassa para uma fila limitada os blocos escritos pelo COPY ... TO STDOUT.
 
-    GET_REG = """
-              SELECT * FROM "HISTORICO" WHERE "ID" = %(identificador)s;
-              """
+    Quando `cancelado` é sinalizado, a próxima escrita falha. Isso apenas interrompe o callback do psycopg2: para que
+    o servidor pare de enviar dados, o COPY também precisa ser cancelado (`connection.cancel()`).
+    """
 
-    DELETE_REG = """
-                 DELETE FROM "HISTORICO" WHERE "ID" = %(identificador)s;
-                 """
+    def __init__(self, fila: queue.Queue, cancelado: Event):
+        self.__fila = fila
+        self.__cancelado = cancelado
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, dados) -> int:
+        if self.__cancelado.is_set():
+            raise IOError('Exportação cancelada')
+        self.__fila.put(dados)
+        return len(dados)
 
 
 class Historico:
@@ -103,56 +436,74 @@ class Historico:
     """
 
     @staticmethod
-    def put(conn: DatabasePostgre, identificador: str, timestamp: int) -> int:
+    def put(conn: DatabasePostgre, identificador: str, timestamp: int, preparada: bool = False) -> int:
         """
         Realiza o insert de um registro.
 
         :param DatabasePostgre conn: conexão com o banco de dados
         :param str identificador: id do registro
         :param int timestamp: timestam do registro
+        :param bool preparada: usa prepared statement
         :return: quantidade de registros escritos
         :rtype: int
         """
+        if preparada:
+            nome, query, _ = Queries.preparada('PUT_REG')
+            return conn.execute_preparada(nome=nome, query=query, values=(identificador, timestamp))
         return conn.execute(query=Queries.PUT_REG,
-                            valores={'identificador': identificador, 'timestamp': timestamp})
+                            values={'identificador': identificador, 'timestamp': timestamp})
 
     @staticmethod
-    def update(conn: DatabasePostgre, identificador: str, formato: str, timestamp: int) -> int:
+    def update(conn: DatabasePostgre, identificador: str, formato: str, timestamp: int,
+               preparada: bool = False) -> int:
         """
         Realiza o update de um registro.
 
         :param DatabasePostgre conn: conexão com o banco de dados
         :param str identificador: id do registro
         :param int timestamp: timestam do registro
+        :param bool preparada: usa prepared statement
         :return: quantidade de registros escritos
         :rtype: int
         """
+        if preparada:
+            nome, query, _ = Queries.preparada('UPDATE_REG')
+            return conn.execute_preparada(nome=nome, query=query, values=(identificador, formato, timestamp))
         return conn.execute(query=Queries.UPDATE_REG,
-                            valores={'identificador': identificador, 'formato': formato, 'timestamp': timestamp})
+                            values={'identificador': identificador, 'formato': formato, 'timestamp': timestamp})
 
     @staticmethod
-    def get(conn: DatabasePostgre, identificador: str) -> tuple:
+    def get(conn: DatabasePostgre, identificador: str, preparada: bool = False, tipo_linha=None) -> tuple:
         """
         Realiza um select de acordo com o id.
 
         :param DatabasePostgre conn: conexão com o banco de dados
         :param str identificador: id do registro
+        :param bool preparada: usa prepared statement
+        :param callable tipo_linha: conversão da linha, ex.: tuple ou RegistroHistorico._make; None retorna DictRow
         :return: registro em forma de tupla (id, timestamp) -> (str, float)
         :rtype: tuple
         """
-        return conn.select_one(query=Queries.GET_REG, valores={'identificador': identificador})
+        if preparada:
+            nome, query, _ = Queries.preparada('GET_REG')
+            return conn.select_one_preparada(nome=nome, query=query, values=(identificador,), tipo_linha=tipo_linha)
+        return conn.select_one(query=Queries.GET_REG, values={'identificador': identificador}, tipo_linha=tipo_linha)
 
     @staticmethod
-    def delete(conn: DatabasePostgre, identificador: str) -> int:
+    def delete(conn: DatabasePostgre, identificador: str, preparada: bool = False) -> int:
         """
         Realiza um delete de acordo com o id.
 
         :param DatabasePostgre conn: conexão com o banco de dados
         :param str identificador: id do registro
+        :param bool preparada: usa prepared statement
         :return: quantidade de registros apagados
         :rtype: int
         """
-        return conn.execute(query=Queries.DELETE_REG, valores={'identificador': identificador})
+        if preparada:
+            nome, query, _ = Queries.preparada('DELETE_REG')
+            return conn.execute_preparada(nome=nome, query=query, values=(identificador,))
+        return conn.execute(query=Queries.DELETE_REG, values={'identificador': identificador})
 
     @staticmethod
     def show(conn: DatabasePostgre) -> tuple:
@@ -163,5 +514,134 @@ class Historico:
         :return: todos os registros, retornando uma tuple[int, list[tuple]]
         :rtype: tuple
         """
-        *_, todos_registros = conn.select(query=Queries.COUNT, valores={})
+        *_, todos_registros = conn.select(query=Queries.COUNT, values={})
         return todos_registros
+
+    @staticmethod
+    def iterar(conn: DatabasePostgre, lote: int = 1000):
+        """
+        Recupera todos os registros (full scan) sob demanda, via cursor server-side, em memória constante enquanto
+        nenhum commit for feito na mesma conexão durante a iteração (ver `DatabasePostgre.iterar`).
+
+        :param DatabasePostgre conn: conexão com o banco de dados
+        :param int lote: quantidade de registros por ida ao servidor
+        :return: iterator de registros
+        :rtype: iterator(DictRow)
+        """
+        return conn.iterar(query=Queries.COUNT, values={}, lote=lote)
+
+    @staticmethod
+    def show_paginado(conn: DatabasePostgre, tamanho_pagina: int = 1000, ultimo: str = ''):
+        """
+        Recupera todos os registros em páginas ordenadas por ID (keyset pagination): cada página é uma consulta
+        independente que parte do último ID da página anterior, sem OFFSET e sem cursor aberto entre páginas.
+
+        :param DatabasePostgre conn: conexão com o banco de dados
+        :param int tamanho_pagina: quantidade de registros por página
+        :param str ultimo: ID a partir do qual a paginação começa (exclusivo)
+        :return: iterator de páginas (listas de registros)
+        :rtype: iterator(list)
+        """
+        while True:
+            *_, pagina = conn.select(query=Queries.PAGINA, values={'ultimo': ultimo, 'limite': tamanho_pagina})
+            if not pagina:
+                return
+            yield pagina
+            ultimo = pagina[-1][0]
+
+    @staticmethod
+    def put_many(conn: DatabasePostgre, registros, tamanho_bloco: int = 65536) -> int:
+        """
+        Realiza o insert de vários registros com COPY ... FROM STDIN, em uma única transação.
+
+        :param DatabasePostgre conn: conexão com o banco de dados
+        :param iterable registros: tuplas (identificador, timestamp)
+        :param int tamanho_bloco: quantidade de caracteres enviados por vez ao servidor
+        :return: quantidade de registros escritos
+        :rtype: int
+        """
+        with conn.transacao() as cursor:
+            cursor.copy_expert(Queries.COPY_PUT, LeitorCSV(registros), size=tamanho_bloco)
+            return cursor.rowcount
+
+    @staticmethod
+    def upsert_many(conn: DatabasePostgre, registros, tamanho_bloco: int = 65536) -> int:
+        """
+        Realiza o insert ou update de vários registros: COPY para uma tabela temporária e INSERT ... ON CONFLICT a
+        partir dela, em uma única transação. Para IDs repetidos em `registros`, prevalece o último (a tabela
+        temporária numera os registros na ordem de carga). Strings vazias são gravadas como NULL (ver LeitorCSV).
+
+        :param DatabasePostgre conn: conexão com o banco de dados
+        :param iterable registros: tuplas (identificador, timestamp, formato, processado)
+        :param int tamanho_bloco: quantidade de caracteres enviados por vez ao servidor
+        :return: quantidade de registros escritos
+        :rtype: int
+        """
+        with conn.transacao() as cursor:
+            cursor.execute(Queries.STAGING)
+            cursor.copy_expert(Queries.COPY_STAGING, LeitorCSV(registros), size=tamanho_bloco)
+            cursor.execute(Queries.UPSERT_STAGING)
+            return cursor.rowcount
+
+    @staticmethod
+    def exportar(conn: DatabasePostgre, arquivo) -> int:
+        """
+        Exporta todos os registros em CSV com COPY ... TO STDOUT para um objeto file-like (texto).
+
+        :param DatabasePostgre conn: conexão com o banco de dados
+        :param arquivo: objeto file-like com .write()
+        :return: quantidade de registros exportados
+        :rtype: int
+        """
+        with conn.transacao() as cursor:
+            cursor.copy_expert(Queries.COPY_EXPORT, arquivo)
+            return cursor.rowcount
+
+    @staticmethod
+    def iterar_exportacao(conn: DatabasePostgre, blocos_pendentes: int = 64):
+        """
+        Exporta todos os registros em CSV com COPY ... TO STDOUT, retornando os blocos de texto à medida que chegam.
+
+        O COPY roda em uma thread auxiliar que alimenta uma fila limitada a `blocos_pendentes` blocos; a conexão não
+        deve ser usada por outras chamadas até o fim da iteração. Interromper a iteração cancela o COPY no servidor
+        (`connection.cancel()`), sem transferir o restante da tabela.
+
+        :param DatabasePostgre conn: conexão com o banco de dados
+        :param int blocos_pendentes: quantidade máxima de blocos em memória
+        :return: iterator de str (linhas CSV)
+        :rtype: iterator(str)
+        """
+        fila = queue.Queue(maxsize=blocos_pendentes)
+        cancelado = Event()
+        fim = object()
+        erros = []
+        conexoes = []
+
+        def copiar():
+            try:
+                with conn.transacao() as cursor:
+                    conexoes.append(cursor.connection)
+                    if not cancelado.is_set():
+                        cursor.copy_expert(Queries.COPY_EXPORT, EscritorFila(fila, cancelado))
+            except Exception as e:
+                erros.append(e)
+            finally:
+                fila.put(fim)
+
+        Thread(target=copiar, daemon=True).start()
+        bloco = None
+        try:
+            while True:
+                bloco = fila.get()
+                if bloco is fim:
+                    break
+                yield bloco
+        finally:
+            if bloco is not fim:
+                cancelado.set()
+                for conexao in conexoes:
+                    conexao.cancel()
+                while fila.get() is not fim:
+                    pass
+        if erros:
+            raise erros[0]
@@ -0,0 +1,221 @@
+import asyncpg
+
+from contextlib import asynccontextmanager
+
+from .postgre_comum import Queries, converter_linha
+
+
+def linhas_afetadas(status: str) -> int:
+    """
+    Extrai a quantidade de registros afetados do status retornado pelo asyncpg, ex.: 'UPDATE 1', 'INSERT 0 1'.
+
+    :param str status: status do comando
+    :return: quantidade de registros afetados
+    :rtype: int
+    """
+    try:
+        return int(status.rsplit(' ', 1)[-1])
+    except (AttributeError, ValueError):
+        return 0
+
+
+class __ModPostgreAsync:
+    """
+    Classe para modelar um pool de conexões com banco de dados Postgre, versão asyncio (asyncpg).
+
+    O pool é aberto em `conectar` (ou ao entrar no `async with`) e fechado em `fechar`. Cada chamada pega uma conexão
+    emprestada; o asyncpg prepara e mantém em cache (por conexão) os statements executados, e a conexão é reaberta
+    após `max_usos` queries.
+    """
+
+    def __init__(self, host: str, porta: int, database: str, usuario: str, senha: str, minimo: int = 1,
+                 maximo: int = 10, timeout: float = 5.0, max_usos: int = 50000, **kwargs):
+        self.__PARAMS = {'host': host,
+                         'port': porta,
+                         'database': database,
+                         'user': usuario,
+                         'password': senha,
+                         'min_size': minimo,
+                         'max_size': maximo,
+                         'max_queries': max_usos,
+                         'max_inactive_connection_lifetime': kwargs.get('max_inativo', 300.0),
+                         'command_timeout': kwargs.get('command_timeout'),
+                         'statement_cache_size': kwargs.get('statement_cache_size', 100)}
+        self.__TIMEOUT = timeout
+        self.__pool = None
+
+    @property
+    def get_pool(self):
+        return self.__pool
+
+    async def conectar(self):
+        """
+        Abre o pool de conexões, caso ainda não esteja aberto.
+
+        :return: self
+        """
+        if self.__pool is None:
+            self.__pool = await asyncpg.create_pool(**self.__PARAMS)
+        return self
+
+    async def fechar(self):
+        """
+        Fecha todas as conexões do pool.
+        """
+        if self.__pool is not None:
+            await self.__pool.close()
+        self.__pool = None
+
+    async def __aenter__(self):
+        return await self.conectar()
+
+    async def __aexit__(self, type, value, traceback):
+        await self.fechar()
+
+    @asynccontextmanager
+    async def conexao(self):
+        """
+        Async context manager que empresta uma conexão do pool e a devolve ao final do bloco.
+
+        :return: conexão
+        :rtype: asyncpg.Connection
+        :raises: asyncio.TimeoutError quando nenhuma conexão fica livre em `timeout` segundos
+        """
+        async with self.__pool.acquire(timeout=self.__TIMEOUT) as conexao:
+            yield conexao
+
+    @asynccontextmanager
+    async def transacao(self):
+        """
+        Async context manager que entrega uma conexão emprestada para uma sequência de comandos em uma única
+        transação: commit ao final, rollback em caso de exceção.
+
+        :return: conexão
+        :rtype: asyncpg.Connection
+        """
+        async with self.conexao() as conexao:
+            async with conexao.transaction():
+                yield conexao
+
+    async def select(self, *, query: str, values: tuple = ()) -> tuple:
+        async with self.conexao() as conexao:
+            _ = await conexao.fetch(query, *values)
+        return (len(_), _)
+
+    async def iterar(self, *, query: str, values: tuple = (), lote: int = 1000):
+        """
+        Executa um select em um cursor server-side e retorna os registros sob demanda, em memória constante: o
+        servidor envia `lote` registros por vez. A conexão fica emprestada enquanto a iteração não terminar.
+
+        :param str query: query com parâmetros posicionais ($1, $2...)
+        :param tuple values: parâmetros
+        :param int lote: quantidade de registros por ida ao servidor (prefetch)
+        :return: async iterator de registros
+        :rtype: async iterator(asyncpg.Record)
+        """
+        async with self.transacao() as conexao:
+            async for registro in conexao.cursor(query, *values, prefetch=lote):
+                yield registro
+
+    async def select_one(self, *, query: str, values: tuple = (), tipo_linha=None) -> tuple:
+        async with self.conexao() as conexao:
+            return converter_linha(await conexao.fetchrow(query, *values), tipo_linha)
+
+    async def execute(self, *, query: str, values: tuple = ()) -> int:
+        async with self.conexao() as conexao:
+            return linhas_afetadas(await conexao.execute(query, *values))
+
+
+class DatabasePostgreAsync(__ModPostgreAsync):
+    def __init__(self,
+                 host: str,
+                 porta: str,
+                 database: str,
+                 usuario: str,
+                 senha: str,
+                 minimo: int = 1,
+                 maximo: int = 10,
+                 timeout: float = 5.0,
+                 max_usos: int = 50000,
+                 **kwargs):
+        super().__init__(host=host, porta=porta, database=database, usuario=usuario, senha=senha, minimo=minimo,
+                         maximo=maximo, timeout=timeout, max_usos=max_usos, **kwargs)
+
+
+class HistoricoAsync:
+    """
+    Classe para abstrair os métodos para lidar com dados no Postgre, versão asyncio.
+
+    As queries são as mesmas de `Queries`, com parâmetros posicionais ($1, $2...).
+
+    :meta public:
+    """
+
+    @staticmethod
+    async def put(conn: DatabasePostgreAsync, identificador: str, timestamp: int) -> int:
+        """
+        Realiza o insert de um registro.
+
+        :param DatabasePostgreAsync conn: pool de conexões com o banco de dados
+        :param str identificador: id do registro
+        :param int timestamp: timestam do registro
+        :return: quantidade de registros escritos
+        :rtype: int
+        """
+        _, query, _ = Queries.preparada('PUT_REG')
+        return await conn.execute(query=query, values=(identificador, timestamp))
+
+    @staticmethod
+    async def update(conn: DatabasePostgreAsync, identificador: str, formato: str, timestamp: int) -> int:
+        """
+        Realiza o update de um registro.
+
+        :param DatabasePostgreAsync conn: pool de conexões com o banco de dados
+        :param str identificador: id do registro
+        :param int timestamp: timestam do registro
+        :return: quantidade de registros escritos
+        :rtype: int
+        """
+        _, query, _ = Queries.preparada('UPDATE_REG')
+        return await conn.execute(query=query, values=(identificador, formato, timestamp))
+
+    @staticmethod
+    async def get(conn: DatabasePostgreAsync, identificador: str, tipo_linha=None) -> tuple:
+        """
+        Realiza um select de acordo com o id.
+
+        :param DatabasePostgreAsync conn: pool de conexões com o banco de dados
+        :param str identificador: id do registro
+        :param callable tipo_linha: conversão da linha, ex.: tuple ou RegistroHistorico._make; None retorna Record
+        :return: registro em forma de tupla (id, timestamp) -> (str, float)
+        :rtype: tuple
+        """
+        _, query, _ = Queries.preparada('GET_REG')
+        return await conn.select_one(query=query, values=(identificador,), tipo_linha=tipo_linha)
+
+    @staticmethod
+    async def delete(conn: DatabasePostgreAsync, identificador: str) -> int:
+        """
+        Realiza um delete de acordo com o id.
+
+        :param DatabasePostgreAsync conn: pool de conexões com o banco de dados
+        :param str identificador: id do registro
+        :return: quantidade de registros apagados
+        :rtype: int
+        """
+        _, query, _ = Queries.preparada('DELETE_REG')
+        return await conn.execute(query=query, values=(identificador,))
+
+    @staticmethod
+    async def show(conn: DatabasePostgreAsync, lote: int = 1000, tipo_linha=None):
+        """
+        Recupera todos os registros (full scan) sob demanda, via cursor server-side, em memória constante.
+
+        :param DatabasePostgreAsync conn: pool de conexões com o banco de dados
+        :param int lote: quantidade de registros por ida ao servidor
+        :param callable tipo_linha: conversão da linha, ex.: RegistroHistorico._make; None retorna Record
+        :return: async iterator de registros
+        :rtype: async iterator(asyncpg.Record)
+        """
+        async for registro in conn.iterar(query=Queries.COUNT.strip().rstrip(';'), values=(), lote=lote):
+            yield converter_linha(registro, tipo_linha)
@@ -0,0 +1,104 @@
+import functools
+
+from collections import namedtuple
+
+
+def converter_linha(linha, tipo_linha=None):
+    """
+    Converte uma linha retornada pelo cursor.
+
+    :param linha: linha (tupla ou DictRow)
+    :param callable tipo_linha: aplicado à linha, ex.: tuple ou RegistroHistorico._make; None mantém a linha
+    :return: linha convertida
+    """
+    if linha is None or tipo_linha is None:
+        return linha
+    return tipo_linha(linha)
+
+
+class Queries:
+    """
+    Classe para abstrair as queries para lidar com dados no Postgre.
+
+    :meta public:
+    """
+
+    TABELA = 'HISTORICO'
+
+    COLUNAS = ['ID', 'TIMESTAMP', 'FORMATO', 'PROCESSADO']
+
+    COUNT = """SELECT * FROM "HISTORICO";"""
+
+    PAGINA = """
+             SELECT * FROM "HISTORICO" WHERE "ID" > %(ultimo)s ORDER BY "ID" LIMIT %(limite)s;
+             """
+
+    PUT_REG = """
+              INSERT INTO "HISTORICO" ("ID", "TIMESTAMP") VALUES (%(identificador)s, %(timestamp)s);
+              """
+
+    UPDATE_REG = """
+                 UPDATE "HISTORICO"
+                    SET
+                        ("FORMATO", "PROCESSADO") = (%(formato)s, %(timestamp)s)
+                 WHERE "ID" = %(identificador)s;
+                 """
+
+    GET_REG = """
+              SELECT * FROM "HISTORICO" WHERE "ID" = %(identificador)s;
+              """
+
+    DELETE_REG = """
+                 DELETE FROM "HISTORICO" WHERE "ID" = %(identificador)s;
+                 """
+
+    COPY_PUT = """COPY "HISTORICO" ("ID", "TIMESTAMP") FROM STDIN WITH (FORMAT csv);"""
+
+    STAGING = """
+              CREATE TEMP TABLE "HISTORICO_STAGING" (LIKE "HISTORICO" INCLUDING DEFAULTS, "ORDEM" bigserial)
+                  ON COMMIT DROP;
+              """
+
+    COPY_STAGING = """
+                   COPY "HISTORICO_STAGING" ("ID", "TIMESTAMP", "FORMATO", "PROCESSADO") FROM STDIN WITH (FORMAT csv);
+                   """
+
+    UPSERT_STAGING = """
+                     INSERT INTO "HISTORICO" ("ID", "TIMESTAMP", "FORMATO", "PROCESSADO")
+                        SELECT DISTINCT ON ("ID") "ID", "TIMESTAMP", "FORMATO", "PROCESSADO"
+                        FROM "HISTORICO_STAGING"
+                        ORDER BY "ID", "ORDEM" DESC
+                     ON CONFLICT ("ID") DO UPDATE
+                        SET
+                            ("TIMESTAMP", "FORMATO", "PROCESSADO") =
+                            (EXCLUDED."TIMESTAMP", EXCLUDED."FORMATO", EXCLUDED."PROCESSADO");
+                     """
+
+    COPY_EXPORT = """COPY "HISTORICO" TO STDOUT WITH (FORMAT csv);"""
+
+    PARAMETROS = {
+        'PUT_REG': ('identificador', 'timestamp'),
+        'UPDATE_REG': ('identificador', 'formato', 'timestamp'),
+        'GET_REG': ('identificador',),
+        'DELETE_REG': ('identificador',),
+    }
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def preparada(nome: str) -> tuple:
+        """
+        Converte uma das queries de PARAMETROS para prepared statement, trocando os parâmetros nomeados por
+        posicionais ($1, $2...).
+
+        :param str nome: nome da constante, ex.: 'GET_REG'
+        :return: (nome do statement, query, ordem dos parâmetros)
+        :rtype: tuple
+        """
+        parametros = Queries.PARAMETROS[nome]
+        query = getattr(Queries, nome).strip().rstrip(';')
+        for n, parametro in enumerate(parametros, 1):
+            query = query.replace(f'%({parametro})s', f'${n}')
+        return f'misc_crud_{nome.lower()}', query, parametros
+
+
+RegistroHistorico = namedtuple('RegistroHistorico', ['id', 'timestamp', 'formato', 'processado'])
@@ -1,12 +1,40 @@
+import time
+import random
 import functools
+import itertools
 
 from datetime import datetime
+from threading import Event, Lock, Thread
+from contextlib import contextmanager
+from collections import OrderedDict
 
-from redis import StrictRedis
-from redis.exceptions import ConnectionError
+from redis import StrictRedis, BlockingConnectionPool, ConnectionPool
+from redis.exceptions import ConnectionError, TimeoutError, ResponseError
 
 import logging as logger
 
+INDICE_TEMPO = 'misc_crud:indice_tempo'
+
+POOLS = {}
+
+_LOCK_POOLS = Lock()
+
+OUVINTES = {}
+
+_LOCK_OUVINTES = Lock()
+
+# mensagem do ConnectionError do BlockingConnectionPool quando nenhuma conexão fica livre em `timeout` segundos
+ERRMSG_POOL_ESGOTADO = 'No connection available.'
+
+# SET NX e ZADD no mesmo passo, para que o índice nunca aponte para uma chave que não foi gravada
+LUA_SET_REG = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX') then
+    redis.call('ZADD', KEYS[2], ARGV[1], KEYS[1])
+    return 1
+end
+return 0
+"""
+
 
 class PacotaoRedisException(Exception):
     """
@@ -22,13 +50,522 @@ class PacotaoRedisException(Exception):
         self.excecao = excecao
 
 
-# TODO: implementar?
+def pool_conexoes(host: str, porta: int, senha: str, db: int = 0, max_conexoes: int = 50, timeout: float = 5.0,
+                  socket_timeout: float = None, socket_connect_timeout: float = None, socket_keepalive: bool = True,
+                  health_check_interval: int = 30) -> BlockingConnectionPool:
+    """
+    Retorna o BlockingConnectionPool do processo para o host, criando-o na primeira chamada.
+
+    Instâncias que apontam para o mesmo host/porta/db/credenciais compartilham o pool e, portanto, os sockets.
+    A configuração vale para quem cria o pool; chamadas seguintes reaproveitam o pool existente.
+
+    :param str host: host do Redis
+    :param int porta: porta
+    :param str senha: senha
+    :param int db: número do banco
+    :param int max_conexoes: quantidade máxima de conexões abertas
+    :param float timeout: segundos de espera por uma conexão livre antes de ConnectionError
+    :param float socket_timeout: timeout de leitura/escrita no socket
+    :param float socket_connect_timeout: timeout de conexão
+    :param bool socket_keepalive: habilita TCP keepalive
+    :param int health_check_interval: segundos sem uso após os quais a conexão é verificada com PING
+    :returns: pool de conexões
+    :rtype: BlockingConnectionPool
+    """
+    chave = (host, int(porta), db, senha)
+    with _LOCK_POOLS:
+        if chave not in POOLS:
+            POOLS[chave] = BlockingConnectionPool(host=host, port=porta, password=senha, db=db,
+                                                  max_connections=max_conexoes, timeout=timeout,
+                                                  socket_timeout=socket_timeout,
+                                                  socket_connect_timeout=socket_connect_timeout,
+                                                  socket_keepalive=socket_keepalive,
+                                                  health_check_interval=health_check_interval,
+                                                  decode_responses=True, encoding='utf-8')
+        return POOLS[chave]
+
+
+def pool_esgotado(erro: Exception) -> bool:
+    """
+    Indica se o erro veio do pool local esgotado (nenhuma conexão livre no prazo), e não de uma falha do host.
+
+    :param Exception erro: exceção da leitura
+    :returns: True/False
+    :rtype: bool
+    """
+    return isinstance(erro, ConnectionError) and str(erro) == ERRMSG_POOL_ESGOTADO
+
+
+def paginacao_zrange(offset: int = None, quantidade: int = None) -> dict:
+    """
+    Converte offset/quantidade opcionais nos argumentos start/num do ZRANGEBYSCORE, que o redis-py exige juntos.
+
+    :param int offset: quantidade de registros a pular
+    :param int quantidade: quantidade máxima de registros
+    :returns: dict {start, num}, vazio quando nenhum dos dois é informado
+    :rtype: dict
+    """
+    if offset is None and quantidade is None:
+        return {}
+    return {'start': offset or 0, 'num': -1 if quantidade is None else quantidade}
+
+
+class RoteadorLeitura:
+    """
+    Distribui as leituras entre as réplicas (slaves) do Redis.
+
+    Estratégias:
+        - 'round_robin': réplicas saudáveis em rodízio
+        - 'menos_pendentes': réplica saudável com menos leituras em andamento
+
+    Uma réplica que falha com ConnectionError/TimeoutError é marcada como indisponível e volta a receber leituras
+    quando responder ao PING da sonda periódica. Sem réplicas disponíveis, as leituras vão para o master. O pool
+    local esgotado (ver `pool_esgotado`) não indica falha da réplica e não a marca como indisponível.
+
+    A sonda é uma thread iniciada sob demanda, quando alguma réplica fica indisponível, e encerrada assim que todas
+    voltam a responder; com todas as réplicas saudáveis nenhuma thread fica ativa.
+    """
+
+    MASTER = -1
+
+    def __init__(self, master: StrictRedis, slaves: list, estrategia: str = 'round_robin',
+                 intervalo_sonda: float = 5.0):
+        if estrategia not in ('round_robin', 'menos_pendentes'):
+            raise PacotaoRedisException(f'Estratégia de leitura desconhecida: {estrategia}')
+        self.__MASTER = master
+        self.__SLAVES = slaves
+        self.__ESTRATEGIA = estrategia
+        self.__disponiveis = [True] * len(slaves)
+        self.__pendentes = [0] * len(slaves)
+        self.__rodizio = itertools.count()
+        self.__INTERVALO_SONDA = intervalo_sonda
+        self.__lock = Lock()
+        self.__parar = Event()
+        self.__sonda = None
+
+    @property
+    def disponiveis(self) -> tuple:
+        return tuple(self.__disponiveis)
+
+    def __sondar_periodicamente(self, intervalo: float):
+        while not self.__parar.wait(intervalo):
+            self.sondar()
+            with self.__lock:
+                if all(self.__disponiveis):
+                    self.__sonda = None
+                    return
+        with self.__lock:
+            self.__sonda = None
+
+    def sondar(self):
+        """
+        Envia PING para todas as réplicas e atualiza a disponibilidade de cada uma.
+        """
+        for indice, slave in enumerate(self.__SLAVES):
+            try:
+                slave.ping()
+                self.marcar(indice, True)
+            except (ConnectionError, TimeoutError) as e:
+                if not pool_esgotado(e):
+                    self.marcar(indice, False)
+
+    def marcar(self, indice: int, disponivel: bool):
+        """
+        Marca uma réplica como disponível/indisponível.
+
+        :param int indice: índice da lista hosts slaves
+        :param bool disponivel: disponibilidade
+        """
+        if indice == self.MASTER:
+            return
+        with self.__lock:
+            if self.__disponiveis[indice] != disponivel:
+                logger.warning(f'Réplica Redis {indice} {"disponível" if disponivel else "indisponível"}')
+            self.__disponiveis[indice] = disponivel
+            if not disponivel and self.__INTERVALO_SONDA and self.__sonda is None and not self.__parar.is_set():
+                self.__sonda = Thread(target=self.__sondar_periodicamente, args=(self.__INTERVALO_SONDA,),
+                                      daemon=True)
+                self.__sonda.start()
+
+    def escolher(self, excluir=()) -> int:
+        """
+        Escolhe a réplica para a próxima leitura.
+
+        :param iterable excluir: índices a desconsiderar
+        :returns: índice da lista hosts slaves, ou RoteadorLeitura.MASTER
+        :rtype: int
+        """
+        with self.__lock:
+            candidatos = [i for i, ok in enumerate(self.__disponiveis) if ok and i not in excluir]
+            if not candidatos:
+                return self.MASTER
+            inicio = next(self.__rodizio) % len(candidatos)
+            candidatos = candidatos[inicio:] + candidatos[:inicio]
+            if self.__ESTRATEGIA == 'menos_pendentes':
+                return min(candidatos, key=lambda i: self.__pendentes[i])
+            return candidatos[0]
+
+    def cliente(self, indice: int) -> StrictRedis:
+        return self.__MASTER if indice == self.MASTER else self.__SLAVES[indice]
+
+    @contextmanager
+    def ler(self, i: int = None, excluir=()):
+        """
+        Context manager que entrega o cliente para uma leitura, contabilizando-a como pendente.
+
+        :param int i: índice fixo da lista hosts slaves, None para usar o roteamento
+        :param iterable excluir: índices a desconsiderar no roteamento
+        :returns: cliente Redis
+        :rtype: StrictRedis
+        """
+        indice = self.escolher(excluir=excluir) if i is None else i
+        if indice != self.MASTER:
+            with self.__lock:
+                self.__pendentes[indice] += 1
+        try:
+            yield self.cliente(indice)
+        except (ConnectionError, TimeoutError) as e:
+            if not pool_esgotado(e):
+                self.marcar(indice, False)
+            raise
+        finally:
+            if indice != self.MASTER:
+                with self.__lock:
+                    self.__pendentes[indice] -= 1
+
+    def fechar(self):
+        """
+        Interrompe a sonda periódica.
+        """
+        self.__parar.set()
+
+
+class CacheProximo:
+    """
+    Cache em processo (LRU com TTL) para as leituras de get_reg.
+
+    A coerência com o Redis é mantida por keyspace notifications: o `OuvinteKeyspace` do master/db (um por processo,
+    ver `ouvinte_keyspace`) invalida a chave local a cada evento. Enquanto a assinatura estiver fora, o cache fica
+    vazio e desativado.
+    O servidor precisa ter `notify-keyspace-events` com ao menos `Kg$x` (ou `KA`), ver `notificacoes_habilitadas`.
+
+    Cada leitura do Redis é registrada com `reservar` antes do GET; `invalidar` descarta apenas a reserva da chave
+    alterada, de forma que escritas em outras chaves não impedem o preenchimento do cache.
+    """
+
+    def __init__(self, max_chaves: int = 10000, ttl: float = 60):
+        self.__MAX_CHAVES = max_chaves
+        self.__TTL = ttl
+        self.__entradas = OrderedDict()
+        self.__lock = Lock()
+        self.__ouvinte = None
+        self.__pendentes = {}
+        self.__tokens = itertools.count()
+        self.__ativo = False
+        self.acertos = 0
+        self.falhas = 0
+        self.invalidacoes = 0
+
+    @staticmethod
+    def notificacoes_habilitadas(cliente: StrictRedis) -> bool:
+        """
+        Verifica se o servidor publica as keyspace notifications necessárias para a invalidação (`K` mais `g$x` ou
+        `A` em `notify-keyspace-events`).
+
+        :param StrictRedis cliente: cliente do master
+        :return: True/False
+        :rtype: bool
+        :raises: ResponseError quando o servidor não permite CONFIG GET
+        """
+        flags = cliente.config_get('notify-keyspace-events').get('notify-keyspace-events', '')
+        return 'K' in flags and ('A' in flags or all(c in flags for c in 'g$x'))
+
+    def obter(self, chave: str):
+        """
+        Recupera um valor do cache local.
+
+        :param str chave: chave do cache
+        :returns: (True, valor) em caso de acerto, (False, None) caso contrário
+        :rtype: tuple
+        """
+        with self.__lock:
+            entrada = self.__entradas.get(chave)
+            if entrada is None or entrada[1] < time.monotonic():
+                if entrada is not None:
+                    del self.__entradas[chave]
+                self.falhas += 1
+                return False, None
+            self.__entradas.move_to_end(chave)
+            self.acertos += 1
+            return True, entrada[0]
+
+    def reservar(self, chave: str) -> int:
+        """
+        Registra o início de uma leitura da chave no Redis.
+
+        :param str chave: chave do cache
+        :return: token a ser informado em `guardar` e `liberar`
+        :rtype: int
+        """
+        with self.__lock:
+            token = next(self.__tokens)
+            self.__pendentes[chave] = token
+            return token
+
+    def liberar(self, chave: str, token: int):
+        """
+        Encerra a leitura registrada por `reservar`.
+
+        :param str chave: chave do cache
+        :param int token: token retornado por `reservar`
+        """
+        with self.__lock:
+            if self.__pendentes.get(chave) == token:
+                del self.__pendentes[chave]
+
+    def guardar(self, chave: str, valor, token: int):
+        """
+        Grava um valor lido do Redis, desde que a chave não tenha sido invalidada desde o início da leitura.
+
+        :param str chave: chave do cache
+        :param valor: valor lido
+        :param int token: token retornado por `reservar` antes da leitura
+        """
+        with self.__lock:
+            if not self.__ativo or self.__pendentes.get(chave) != token:
+                return
+            self.__entradas[chave] = (valor, time.monotonic() + self.__TTL)
+            self.__entradas.move_to_end(chave)
+            while len(self.__entradas) > self.__MAX_CHAVES:
+                self.__entradas.popitem(last=False)
+
+    def invalidar(self, chave: str):
+        """
+        Remove uma chave do cache local.
+
+        :param str chave: chave do cache
+        """
+        with self.__lock:
+            self.invalidacoes += 1
+            self.__pendentes.pop(chave, None)
+            self.__entradas.pop(chave, None)
+
+    def limpar(self):
+        """
+        Esvazia o cache local.
+        """
+        with self.__lock:
+            self.__pendentes.clear()
+            self.__entradas.clear()
+
+    def ativar(self, ativo: bool):
+        """
+        Esvazia o cache local e o ativa (assinatura estabelecida) ou desativa (assinatura perdida).
+
+        :param bool ativo: True/False
+        """
+        with self.__lock:
+            self.__ativo = ativo
+            self.__pendentes.clear()
+            self.__entradas.clear()
+
+    def escutar(self, cliente: StrictRedis, db: int = 0):
+        """
+        Registra o cache no ouvinte de keyspace notifications do master/db, que invalida as chaves alteradas.
+
+        :param StrictRedis cliente: cliente do master
+        :param int db: número do banco
+        """
+        self.__ouvinte = ouvinte_keyspace(cliente, db)
+        while not self.__ouvinte.registrar(self):
+            self.__ouvinte = ouvinte_keyspace(cliente, db)
+
+    def estatisticas(self) -> dict:
+        """
+        Retorna os contadores do cache local.
+
+        :return: dict {acertos, falhas, invalidacoes, entradas, taxa_acerto}
+        :rtype: dict
+        """
+        with self.__lock:
+            consultas = self.acertos + self.falhas
+            return {'acertos': self.acertos, 'falhas': self.falhas, 'invalidacoes': self.invalidacoes,
+                    'entradas': len(self.__entradas), 'taxa_acerto': self.acertos / consultas if consultas else 0.0}
+
+    def fechar(self):
+        """
+        Remove o cache do ouvinte de keyspace notifications e o desativa.
+        """
+        if self.__ouvinte is not None:
+            self.__ouvinte.remover(self)
+            self.__ouvinte = None
+        self.ativar(False)
+
+
+class OuvinteKeyspace:
+    """
+    Assinatura única de `__keyspace@<db>__:*` no master, compartilhada por todos os CacheProximo do processo que
+    apontam para o mesmo pool/db.
+
+    A assinatura usa uma conexão própria (fora do BlockingConnectionPool compartilhado) e uma única thread, que
+    repassa cada invalidação aos caches registrados. A thread é encerrada quando o último cache é removido.
+    """
+
+    def __init__(self, cliente: StrictRedis, db: int = 0):
+        pool = cliente.connection_pool
+        self.__CHAVE = (pool, db)
+        self.__cliente = StrictRedis(connection_pool=ConnectionPool(connection_class=pool.connection_class,
+                                                                    **pool.connection_kwargs))
+        self.__PADRAO = f'__keyspace@{db}__:*'
+        self.__caches = set()
+        self.__lock = Lock()
+        self.__parar = Event()
+        self.__ativo = False
+        self.__thread = None
+
+    def registrar(self, cache: CacheProximo) -> bool:
+        """
+        Registra um cache para receber as invalidações, iniciando a thread na primeira chamada.
+
+        :param CacheProximo cache: cache próximo
+        :returns: False se o ouvinte já foi encerrado (o chamador deve obter um novo com `ouvinte_keyspace`)
+        :rtype: bool
+        """
+        with self.__lock:
+            if self.__parar.is_set():
+                return False
+            self.__caches.add(cache)
+            if self.__ativo:
+                cache.ativar(True)
+            if self.__thread is None:
+                self.__thread = Thread(target=self.__escutar, daemon=True)
+                self.__thread.start()
+            return True
+
+    def remover(self, cache: CacheProximo):
+        """
+        Remove um cache; sem caches registrados, a assinatura é encerrada.
+
+        :param CacheProximo cache: cache próximo
+        """
+        with self.__lock:
+            self.__caches.discard(cache)
+            if self.__caches:
+                return
+            self.__parar.set()
+        with _LOCK_OUVINTES:
+            if OUVINTES.get(self.__CHAVE) is self:
+                del OUVINTES[self.__CHAVE]
+
+    def __ativar(self, ativo: bool):
+        with self.__lock:
+            self.__ativo = ativo
+            caches = list(self.__caches)
+        for cache in caches:
+            cache.ativar(ativo)
+
+    def __escutar(self):
+        prefixo = len(self.__PADRAO) - 1
+        while not self.__parar.is_set():
+            pubsub = self.__cliente.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.psubscribe(self.__PADRAO)
+                self.__ativar(True)
+                while not self.__parar.is_set():
+                    mensagem = pubsub.get_message(timeout=1.0)
+                    if mensagem and mensagem.get('type') == 'pmessage':
+                        chave = mensagem['channel'][prefixo:]
+                        with self.__lock:
+                            caches = list(self.__caches)
+                        for cache in caches:
+                            cache.invalidar(chave)
+            except (ConnectionError, TimeoutError) as e:
+                logger.warning(f'Assinatura de keyspace notifications perdida, cache próximo desativado: {e}')
+                self.__parar.wait(1.0)
+            finally:
+                self.__ativar(False)
+                pubsub.close()
+        self.__cliente.connection_pool.disconnect()
+
+
+def ouvinte_keyspace(cliente: StrictRedis, db: int = 0) -> OuvinteKeyspace:
+    """
+    Retorna o OuvinteKeyspace do processo para o pool/db do master, criando-o na primeira chamada.
+
+    :param StrictRedis cliente: cliente do master
+    :param int db: número do banco
+    :returns: ouvinte de keyspace notifications
+    :rtype: OuvinteKeyspace
+    """
+    chave = (cliente.connection_pool, db)
+    with _LOCK_OUVINTES:
+        if chave not in OUVINTES:
+            OUVINTES[chave] = OuvinteKeyspace(cliente, db)
+        return OUVINTES[chave]
+
+
+class PoliticaRetry:
+    """
+    Política de retentativa para leituras: backoff exponencial com full jitter, limitado por uma quantidade de
+    tentativas e por um prazo total.
+
+    Como o RoteadorLeitura marca como indisponível a réplica que falhou, a retentativa é feita em outra réplica
+    (ou no master).
+    """
+
+    def __init__(self, tentativas: int = 3, espera_base: float = 0.05, espera_maxima: float = 1.0,
+                 prazo: float = 2.0, excecoes: tuple = (ConnectionError, TimeoutError)):
+        self.__TENTATIVAS = max(1, tentativas)
+        self.__ESPERA_BASE = espera_base
+        self.__ESPERA_MAXIMA = espera_maxima
+        self.__PRAZO = prazo
+        self.__EXCECOES = excecoes
+        self.__lock = Lock()
+        self.retentativas = 0
+        self.esgotadas = 0
+
+    def executar(self, func, *args, **kwargs):
+        """
+        Executa `func`, repetindo-a nas exceções configuradas enquanto houver tentativas e prazo.
+
+        :param callable func: função a executar
+        :returns: retorno de func
+        :raises: a última exceção, quando as tentativas ou o prazo se esgotam
+        """
+        limite = time.monotonic() + self.__PRAZO
+        for tentativa in range(self.__TENTATIVAS):
+            try:
+                return func(*args, **kwargs)
+            except self.__EXCECOES as e:
+                espera = random.uniform(0, min(self.__ESPERA_MAXIMA, self.__ESPERA_BASE * 2 ** tentativa))
+                if tentativa + 1 == self.__TENTATIVAS or time.monotonic() + espera > limite:
+                    with self.__lock:
+                        self.esgotadas += 1
+                    raise
+                with self.__lock:
+                    self.retentativas += 1
+                logger.warning(f'Falha na leitura do Redis ({e}), nova tentativa em {espera:.3f}s')
+                time.sleep(espera)
+
+    def estatisticas(self) -> dict:
+        """
+        Retorna os contadores da política.
+
+        :return: dict {retentativas, esgotadas}
+        :rtype: dict
+        """
+        with self.__lock:
+            return {'retentativas': self.retentativas, 'esgotadas': self.esgotadas}
+
+
 def retry_read(func):
     """
+    Decorator que aplica a PoliticaRetry da instância (get_politica_retry) a um método de leitura.
     """
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        return func(*args, **kwargs)
+        return args[0].get_politica_retry.executar(func, *args, **kwargs)
+    return wrapper
 
 
 class __ModRedis:
@@ -37,78 +574,249 @@ class __ModRedis:
 
     Por padrão, a lib redis já utiliza *connection pools*, portanto podemos utilizar o conector de alto nível diretamente.
 
-    A lib também já realiza a gestão das conexões.
+    Os pools (BlockingConnectionPool) são compartilhados por todas as instâncias do processo que apontam para o mesmo
+    host, ver `pool_conexoes`.
     """
 
-    def __init__(self, master: str, slaves: list, porta: int, senha: str):
+    def __init__(self, master: str, slaves: list, porta: int, senha: str, **kwargs):
 
-        self.__MASTER = StrictRedis(host=master, port=porta, password=senha, decode_responses=True, encoding='utf-8')
-        self.__SLAVES = [StrictRedis(host=s, port=porta, password=senha, decode_responses=True, encoding='utf-8') for s in slaves]
+        config_pool = {k: kwargs[k] for k in ('db', 'max_conexoes', 'timeout', 'socket_timeout',
+                                              'socket_connect_timeout', 'socket_keepalive', 'health_check_interval')
+                       if k in kwargs}
+        self.__MASTER = StrictRedis(connection_pool=pool_conexoes(master, porta, senha, **config_pool))
+        self.__SLAVES = [StrictRedis(connection_pool=pool_conexoes(s, porta, senha, **config_pool)) for s in slaves]
 
         try:
             for h in [self.__MASTER, *self.__SLAVES]:
                 h.ping()
         except ConnectionError:
-            msg = f'Não foi possível conectar ao Redis: {h.get_connection_kwargs()["hosts"]}'
+            msg = f'Não foi possível conectar ao Redis: {h.get_connection_kwargs().get("host")}'
             logger.error(msg)
             raise PacotaoRedisException('Não foi possível conectar ao Redis')
 
-    def listar_regs(self, i=0) -> tuple:
+        self.__INDICE = kwargs.get('indice', INDICE_TEMPO)
+        self.__ROTEADOR = RoteadorLeitura(master=self.__MASTER, slaves=self.__SLAVES,
+                                          estrategia=kwargs.get('estrategia_leitura', 'round_robin'),
+                                          intervalo_sonda=kwargs.get('intervalo_sonda', 5.0))
+        self.__RETRY = PoliticaRetry(tentativas=kwargs.get('retry_tentativas', 3),
+                                     espera_base=kwargs.get('retry_espera_base', 0.05),
+                                     espera_maxima=kwargs.get('retry_espera_maxima', 1.0),
+                                     prazo=kwargs.get('retry_prazo', 2.0))
+        self.__CACHE = None
+        if kwargs.get('cache_proximo', False):
+            habilitadas = True
+            if kwargs.get('configurar_notificacoes', False):
+                self.__MASTER.config_set('notify-keyspace-events', 'KA')
+            else:
+                try:
+                    habilitadas = CacheProximo.notificacoes_habilitadas(self.__MASTER)
+                except ResponseError as e:
+                    logger.warning(f'Não foi possível verificar notify-keyspace-events, cache próximo ativado: {e}')
+            if habilitadas:
+                self.__CACHE = CacheProximo(max_chaves=kwargs.get('cache_proximo_max', 10000),
+                                            ttl=kwargs.get('cache_proximo_ttl', 60))
+                self.__CACHE.escutar(self.__MASTER, db=kwargs.get('db', 0))
+            else:
+                logger.error('notify-keyspace-events sem K e g$x (ou A) no servidor, cache próximo desativado')
+        self.__SET_REG = self.__MASTER.register_script(LUA_SET_REG)
+
+    @property
+    def get_roteador(self):
+        return self.__ROTEADOR
+
+    @property
+    def get_cache(self):
+        return self.__CACHE
+
+    @property
+    def get_politica_retry(self):
+        return self.__RETRY
+
+    def fechar(self):
+        """
+        Interrompe as tarefas de fundo (sonda das réplicas e invalidação do cache próximo).
+        """
+        self.__ROTEADOR.fechar()
+        if self.__CACHE is not None:
+            self.__CACHE.fechar()
+
+    def __invalidar(self, *identificadores):
+        if self.__CACHE is not None:
+            for identificador in identificadores:
+                self.__CACHE.invalidar(identificador)
+
+    def iterar_regs(self, padrao: str = '*', count: int = 1000, i=None):
+        """
+        Itera sobre os registros (chaves) do cache com SCAN, sem bloquear o Redis.
+
+        :param str padrao: padrão MATCH das chaves
+        :param int count: sugestão de quantidade de chaves por chamada SCAN
+        :param int i: índice da lista hosts slaves, None para usar o roteamento de leituras
+        :returns: iterator de chaves
+        :rtype: iterator(str)
+        """
+        with self.__ROTEADOR.ler(i) as r:
+            yield from (k for k in r.scan_iter(match=padrao, count=count) if k != self.__INDICE)
+
+    def iterar_key_val(self, padrao: str = '*', count: int = 1000, lote: int = 1000, i=None):
+        """
+        Itera sobre os registros (chave, valor) do cache com SCAN, recuperando os valores em lotes com MGET.
+
+        Chaves removidas entre o SCAN e o MGET são descartadas.
+
+        :param str padrao: padrão MATCH das chaves
+        :param int count: sugestão de quantidade de chaves por chamada SCAN
+        :param int lote: quantidade de chaves por MGET
+        :param int i: índice da lista hosts slaves, None para usar o roteamento de leituras
+        :returns: iterator de (chave, valor)
+        :rtype: iterator(tuple)
+        """
+        with self.__ROTEADOR.ler(i) as r:
+            chaves = []
+            for chave in r.scan_iter(match=padrao, count=count):
+                if chave == self.__INDICE:
+                    continue
+                chaves.append(chave)
+                if len(chaves) == lote:
+                    yield from self.__mget(r, chaves)
+                    chaves = []
+            if chaves:
+                yield from self.__mget(r, chaves)
+
+    @staticmethod
+    def __mget(r: StrictRedis, chaves: list):
+        return [(k, v) for k, v in zip(chaves, r.mget(chaves)) if v is not None]
+
+    @retry_read
+    def listar_regs(self, i=None) -> tuple:
         """
         Recupera todos os registros (chaves) do cache.
 
-        :param int i: índice da lista hosts slaves
+        :param int i: índice da lista hosts slaves, None para usar o roteamento de leituras
         :returns: todos os registros
         :rtype: tuple
         """
-        return tuple(self.__SLAVES[i].keys())
+        return tuple(self.iterar_regs(i=i))
 
-    def listar_key_val(self, i=0) -> tuple:
+    @retry_read
+    def listar_key_val(self, i=None) -> tuple:
         """
         Recupera todos os registros (chaves, valor) do cache.
 
-        :param int i: índice da lista hosts slaves
+        :param int i: índice da lista hosts slaves, None para usar o roteamento de leituras
         :returns: todos os registros
         :rtype: tuple
         """
-        k = self.__SLAVES[i].keys()
-        return tuple([*zip(k, [self.get_reg(_) for _ in k])])
+        return tuple(self.iterar_key_val(i=i))
 
     def set_reg(self, identificador: str) -> bool:
         """
-        Grava um novo registro no cache.
+        Grava um novo registro no cache, indexando-o no sorted set de timestamps.
 
         :param str identificador: chave do cache
         :returns: True/False de acordo com o resultado da escrita
         :rtype: bool
         """
-        _ = self.__MASTER.set(name=identificador, value=datetime.now().strftime('%s'), nx=True)
+        _ = self.__SET_REG(keys=[identificador, self.__INDICE], args=[datetime.now().strftime('%s')])
+        self.__invalidar(identificador)
         return True if _ else False
 
+    @retry_read
     def get_mais_antigo(self, i=0) -> str:
         """
-        Recupera o i-ésimo registro mais antigo no cache, uma vez que o registro (chave) é gravado com um valor de timestamp.
+        Recupera o i-ésimo registro mais antigo no cache, a partir do sorted set de timestamps.
 
+        :param int i: posição do registro, 0 para o mais antigo
         :returns: chave mais antiga
         :rtype: str
         """
-        _ = sorted(self.listar_key_val(), key=lambda x: x[-1], reverse=False)
-        return _[i][0] if _ else ''
+        with self.__ROTEADOR.ler() as r:
+            _ = r.zrange(self.__INDICE, i, i)
+        return _[0] if _ else ''
+
+    @retry_read
+    def get_mais_recente(self, i=0) -> str:
+        """
+        Recupera o i-ésimo registro mais recente no cache, a partir do sorted set de timestamps.
+
+        :param int i: posição do registro, 0 para o mais recente
+        :returns: chave mais recente
+        :rtype: str
+        """
+        with self.__ROTEADOR.ler() as r:
+            _ = r.zrevrange(self.__INDICE, i, i)
+        return _[0] if _ else ''
+
+    @retry_read
+    def listar_por_tempo(self, inicio='-inf', fim='+inf', offset: int = None, quantidade: int = None) -> tuple:
+        """
+        Recupera os registros gravados entre dois timestamps (epoch, inclusivos), do mais antigo para o mais recente.
+
+        :param inicio: timestamp inicial, '-inf' por padrão
+        :param fim: timestamp final, '+inf' por padrão
+        :param int offset: quantidade de registros a pular
+        :param int quantidade: quantidade máxima de registros
+        :returns: tuplas (chave, timestamp)
+        :rtype: tuple
+        """
+        with self.__ROTEADOR.ler() as r:
+            _ = r.zrangebyscore(self.__INDICE, inicio, fim, withscores=True, score_cast_func=int,
+                                **paginacao_zrange(offset, quantidade))
+        return tuple(_)
+
+    def reconstruir_indice(self, lote: int = 1000) -> int:
+        """
+        Reconstrói o sorted set de timestamps a partir dos registros existentes, por exemplo para registros gravados
+        antes da existência do índice.
+
+        :param int lote: quantidade de registros por pipeline
+        :returns: quantidade de registros indexados
+        :rtype: int
+        """
+        total = 0
+        pipe = self.__MASTER.pipeline(transaction=False)
+        for chave, valor in self.iterar_key_val(lote=lote):
+            if not valor.isdigit():
+                continue
+            pipe.zadd(self.__INDICE, {chave: int(valor)})
+            total += 1
+            if total % lote == 0:
+                pipe.execute()
+        pipe.execute()
+        return total
 
-    def get_reg(self, identificador: str, i=0) -> str:
+    @retry_read
+    def get_reg(self, identificador: str, i=None) -> str:
         """
         Recupera o valor a partir de um identificador.
 
+        Com o cache próximo ativo, as falhas do cache são lidas do master: as invalidações vêm das keyspace
+        notifications do master, e uma réplica atrasada devolveria um valor já invalidado, que ficaria em cache.
+
         :param str identificador: chave do cache
-        :param int i: índice da lista hosts slaves
+        :param int i: índice da lista hosts slaves, None para usar o roteamento de leituras
         :returns: valor da chave no cache
         :rtype: str
         """
+        usar_cache = self.__CACHE is not None and i is None
+        if usar_cache:
+            acerto, valor = self.__CACHE.obter(identificador)
+            if acerto:
+                return valor
+            token = self.__CACHE.reservar(identificador)
+            i = RoteadorLeitura.MASTER
         try:
-            return self.__SLAVES[i].get(name=identificador)
+            with self.__ROTEADOR.ler(i) as r:
+                valor = r.get(name=identificador)
+            if usar_cache:
+                self.__CACHE.guardar(identificador, valor, token)
+            return valor
         except AttributeError as e:
             logger.error(e)
             return ''
+        finally:
+            if usar_cache:
+                self.__CACHE.liberar(identificador, token)
 
     def delete_reg(self, identificador: str) -> int:
         """
@@ -118,14 +826,71 @@ class __ModRedis:
         :returns: 1/0 de acordo com o resultado da remoção
         :rtype: int
         """
-        _ = self.__MASTER.delete(identificador)
+        pipe = self.__MASTER.pipeline(transaction=True)
+        pipe.delete(identificador)
+        pipe.zrem(self.__INDICE, identificador)
+        _, __ = pipe.execute()
+        self.__invalidar(identificador)
         return 1 if _ else 0
 
+    @staticmethod
+    def __lotes(identificadores, lote: int):
+        bloco = []
+        for identificador in identificadores:
+            bloco.append(identificador)
+            if len(bloco) == lote:
+                yield bloco
+                bloco = []
+        if bloco:
+            yield bloco
+
+    def set_regs(self, identificadores, lote: int = 1000) -> dict:
+        """
+        Grava vários registros no cache, em pipelines não transacionais de `lote` comandos.
+
+        Cada registro continua sendo gravado (e indexado) atomicamente pelo script de set_reg.
+
+        :param iterable identificadores: chaves do cache
+        :param int lote: quantidade de registros por pipeline
+        :returns: dict {identificador: True/False}, False quando a chave já existia (NX)
+        :rtype: dict
+        """
+        resultado = {}
+        timestamp = datetime.now().strftime('%s')
+        for bloco in self.__lotes(identificadores, lote):
+            pipe = self.__MASTER.pipeline(transaction=False)
+            for identificador in bloco:
+                self.__SET_REG(keys=[identificador, self.__INDICE], args=[timestamp], client=pipe)
+            resultado.update((k, True if _ else False) for k, _ in zip(bloco, pipe.execute()))
+            self.__invalidar(*bloco)
+        return resultado
+
+    def delete_regs(self, identificadores, lote: int = 1000) -> dict:
+        """
+        Remove vários registros do cache, em pipelines não transacionais de `lote` comandos.
+
+        :param iterable identificadores: chaves do cache
+        :param int lote: quantidade de registros por pipeline
+        :returns: dict {identificador: 1/0} de acordo com o resultado da remoção
+        :rtype: dict
+        """
+        resultado = {}
+        for bloco in self.__lotes(identificadores, lote):
+            pipe = self.__MASTER.pipeline(transaction=False)
+            for identificador in bloco:
+                pipe.delete(identificador)
+            pipe.zrem(self.__INDICE, *bloco)
+            *removidos, _ = pipe.execute()
+            self.__invalidar(*bloco)
+            resultado.update((k, 1 if _ else 0) for k, _ in zip(bloco, removidos))
+        return resultado
+
 
 class CacheRedis(__ModRedis):
     def __init__(self,
                  master: str,
                  slaves: list,
                  porta: str,
-                 senha: str):
-        super().__init__(master=master, slaves=slaves, porta=porta, senha=senha)
+                 senha: str,
+                 **kwargs):
+        super().__init__(master=master, slaves=slaves, porta=porta, senha=senha, **kwargs)
@@ -0,0 +1,286 @@
+import itertools
+
+from datetime import datetime
+
+from redis.asyncio import StrictRedis, BlockingConnectionPool
+from redis.exceptions import ConnectionError, TimeoutError
+
+import logging as logger
+
+from .redis import PacotaoRedisException, INDICE_TEMPO, LUA_SET_REG, paginacao_zrange
+
+
+class __ModRedisAsync:
+    """
+    Classe para modelar conexão e interação com cache Redis, versão asyncio (redis.asyncio).
+
+    As leituras são distribuídas em rodízio entre as réplicas (slaves); uma réplica que falha com
+    ConnectionError/TimeoutError é pulada e, sem réplicas disponíveis, a leitura vai para o master.
+
+    A conexão é verificada em `conectar` (ou ao entrar no `async with`) e liberada em `fechar`.
+    """
+
+    def __init__(self, master: str, slaves: list, porta: int, senha: str, **kwargs):
+        config_pool = {'max_connections': kwargs.get('max_conexoes', 50),
+                       'timeout': kwargs.get('timeout', 5.0),
+                       'socket_timeout': kwargs.get('socket_timeout'),
+                       'socket_connect_timeout': kwargs.get('socket_connect_timeout'),
+                       'socket_keepalive': kwargs.get('socket_keepalive', True),
+                       'health_check_interval': kwargs.get('health_check_interval', 30),
+                       'db': kwargs.get('db', 0),
+                       'password': senha,
+                       'port': porta,
+                       'decode_responses': True,
+                       'encoding': 'utf-8'}
+        self.__MASTER = StrictRedis(connection_pool=BlockingConnectionPool(host=master, **config_pool))
+        self.__SLAVES = [StrictRedis(connection_pool=BlockingConnectionPool(host=s, **config_pool)) for s in slaves]
+        self.__INDICE = kwargs.get('indice', INDICE_TEMPO)
+        self.__SET_REG = self.__MASTER.register_script(LUA_SET_REG)
+        self.__rodizio = itertools.count()
+
+    async def conectar(self):
+        """
+        Verifica a conexão com o master e as réplicas.
+
+        :return: self
+        :raises: PacotaoRedisException
+        """
+        for h in [self.__MASTER, *self.__SLAVES]:
+            try:
+                await h.ping()
+            except ConnectionError:
+                logger.error(f'Não foi possível conectar ao Redis: {h.get_connection_kwargs().get("host")}')
+                raise PacotaoRedisException('Não foi possível conectar ao Redis')
+        return self
+
+    async def fechar(self):
+        """
+        Fecha os pools de conexões.
+        """
+        for h in [self.__MASTER, *self.__SLAVES]:
+            await h.aclose() if hasattr(h, 'aclose') else await h.close()
+            await h.connection_pool.disconnect()
+
+    async def __aenter__(self):
+        return await self.conectar()
+
+    async def __aexit__(self, type, value, traceback):
+        await self.fechar()
+
+    def __leitores(self, i=None) -> list:
+        """
+        Ordem de clientes a tentar em uma leitura: réplicas em rodízio e, por último, o master.
+        """
+        if i is not None:
+            return [self.__SLAVES[i]]
+        if not self.__SLAVES:
+            return [self.__MASTER]
+        inicio = next(self.__rodizio) % len(self.__SLAVES)
+        return [*self.__SLAVES[inicio:], *self.__SLAVES[:inicio], self.__MASTER]
+
+    async def __ler(self, comando, i=None):
+        """
+        Executa `comando(cliente)` no primeiro leitor que responder.
+        """
+        leitores = self.__leitores(i)
+        for n, r in enumerate(leitores):
+            try:
+                return await comando(r)
+            except (ConnectionError, TimeoutError) as e:
+                if n + 1 == len(leitores):
+                    raise
+                logger.warning(f'Falha na leitura do Redis ({e}), tentando outro host')
+
+    async def iterar_regs(self, padrao: str = '*', count: int = 1000, i=None):
+        """
+        Itera sobre os registros (chaves) do cache com SCAN, sem bloquear o Redis.
+
+        :param str padrao: padrão MATCH das chaves
+        :param int count: sugestão de quantidade de chaves por chamada SCAN
+        :param int i: índice da lista hosts slaves, None para o rodízio
+        :returns: async iterator de chaves
+        :rtype: async iterator(str)
+        """
+        r = self.__leitores(i)[0]
+        async for k in r.scan_iter(match=padrao, count=count):
+            if k != self.__INDICE:
+                yield k
+
+    async def iterar_key_val(self, padrao: str = '*', count: int = 1000, lote: int = 1000, i=None):
+        """
+        Itera sobre os registros (chave, valor) do cache com SCAN, recuperando os valores em lotes com MGET.
+
+        :param str padrao: padrão MATCH das chaves
+        :param int count: sugestão de quantidade de chaves por chamada SCAN
+        :param int lote: quantidade de chaves por MGET
+        :param int i: índice da lista hosts slaves, None para o rodízio
+        :returns: async iterator de (chave, valor)
+        :rtype: async iterator(tuple)
+        """
+        r = self.__leitores(i)[0]
+        chaves = []
+        async for chave in r.scan_iter(match=padrao, count=count):
+            if chave == self.__INDICE:
+                continue
+            chaves.append(chave)
+            if len(chaves) == lote:
+                for par in zip(chaves, await r.mget(chaves)):
+                    if par[1] is not None:
+                        yield par
+                chaves = []
+        if chaves:
+            for par in zip(chaves, await r.mget(chaves)):
+                if par[1] is not None:
+                    yield par
+
+    async def listar_regs(self, i=None) -> tuple:
+        """
+        Recupera todos os registros (chaves) do cache.
+
+        :param int i: índice da lista hosts slaves, None para o rodízio
+        :returns: todos os registros
+        :rtype: tuple
+        """
+        return tuple([k async for k in self.iterar_regs(i=i)])
+
+    async def listar_key_val(self, i=None) -> tuple:
+        """
+        Recupera todos os registros (chaves, valor) do cache.
+
+        :param int i: índice da lista hosts slaves, None para o rodízio
+        :returns: todos os registros
+        :rtype: tuple
+        """
+        return tuple([kv async for kv in self.iterar_key_val(i=i)])
+
+    async def set_reg(self, identificador: str) -> bool:
+        """
+        Grava um novo registro no cache, indexando-o no sorted set de timestamps.
+
+        :param str identificador: chave do cache
+        :returns: True/False de acordo com o resultado da escrita
+        :rtype: bool
+        """
+        _ = await self.__SET_REG(keys=[identificador, self.__INDICE], args=[datetime.now().strftime('%s')])
+        return True if _ else False
+
+    async def get_mais_antigo(self, i=0) -> str:
+        """
+        Recupera o i-ésimo registro mais antigo no cache, a partir do sorted set de timestamps.
+
+        :param int i: posição do registro, 0 para o mais antigo
+        :returns: chave mais antiga
+        :rtype: str
+        """
+        _ = await self.__ler(lambda r: r.zrange(self.__INDICE, i, i))
+        return _[0] if _ else ''
+
+    async def get_mais_recente(self, i=0) -> str:
+        """
+        Recupera o i-ésimo registro mais recente no cache, a partir do sorted set de timestamps.
+
+        :param int i: posição do registro, 0 para o mais recente
+        :returns: chave mais recente
+        :rtype: str
+        """
+        _ = await self.__ler(lambda r: r.zrevrange(self.__INDICE, i, i))
+        return _[0] if _ else ''
+
+    async def listar_por_tempo(self, inicio='-inf', fim='+inf', offset: int = None, quantidade: int = None) -> tuple:
+        """
+        Recupera os registros gravados entre dois timestamps (epoch, inclusivos), do mais antigo para o mais recente.
+
+        :param inicio: timestamp inicial, '-inf' por padrão
+        :param fim: timestamp final, '+inf' por padrão
+        :param int offset: quantidade de registros a pular
+        :param int quantidade: quantidade máxima de registros
+        :returns: tuplas (chave, timestamp)
+        :rtype: tuple
+        """
+        paginacao = paginacao_zrange(offset, quantidade)
+        _ = await self.__ler(lambda r: r.zrangebyscore(self.__INDICE, inicio, fim, withscores=True, score_cast_func=int,
+                                                       **paginacao))
+        return tuple(_)
+
+    async def get_reg(self, identificador: str, i=None) -> str:
+        """
+        Recupera o valor a partir de um identificador.
+
+        :param str identificador: chave do cache
+        :param int i: índice da lista hosts slaves, None para o rodízio
+        :returns: valor da chave no cache
+        :rtype: str
+        """
+        return await self.__ler(lambda r: r.get(name=identificador), i=i)
+
+    async def delete_reg(self, identificador: str) -> int:
+        """
+        Remove um registro do cache a partir do identificador.
+
+        :param str identificador: chave do cache
+        :returns: 1/0 de acordo com o resultado da remoção
+        :rtype: int
+        """
+        async with self.__MASTER.pipeline(transaction=True) as pipe:
+            pipe.delete(identificador)
+            pipe.zrem(self.__INDICE, identificador)
+            _, __ = await pipe.execute()
+        return 1 if _ else 0
+
+    @staticmethod
+    def __lotes(identificadores, lote: int):
+        bloco = []
+        for identificador in identificadores:
+            bloco.append(identificador)
+            if len(bloco) == lote:
+                yield bloco
+                bloco = []
+        if bloco:
+            yield bloco
+
+    async def set_regs(self, identificadores, lote: int = 1000) -> dict:
+        """
+        Grava vários registros no cache, em pipelines não transacionais de `lote` comandos.
+
+        :param iterable identificadores: chaves do cache
+        :param int lote: quantidade de registros por pipeline
+        :returns: dict {identificador: True/False}, False quando a chave já existia (NX)
+        :rtype: dict
+        """
+        resultado = {}
+        timestamp = datetime.now().strftime('%s')
+        for bloco in self.__lotes(identificadores, lote):
+            async with self.__MASTER.pipeline(transaction=False) as pipe:
+                for identificador in bloco:
+                    await self.__SET_REG(keys=[identificador, self.__INDICE], args=[timestamp], client=pipe)
+                resultado.update((k, True if _ else False) for k, _ in zip(bloco, await pipe.execute()))
+        return resultado
+
+    async def delete_regs(self, identificadores, lote: int = 1000) -> dict:
+        """
+        Remove vários registros do cache, em pipelines não transacionais de `lote` comandos.
+
+        :param iterable identificadores: chaves do cache
+        :param int lote: quantidade de registros por pipeline
+        :returns: dict {identificador: 1/0} de acordo com o resultado da remoção
+        :rtype: dict
+        """
+        resultado = {}
+        for bloco in self.__lotes(identificadores, lote):
+            async with self.__MASTER.pipeline(transaction=False) as pipe:
+                for identificador in bloco:
+                    pipe.delete(identificador)
+                pipe.zrem(self.__INDICE, *bloco)
+                *removidos, _ = await pipe.execute()
+            resultado.update((k, 1 if _ else 0) for k, _ in zip(bloco, removidos))
+        return resultado
+
+
+class CacheRedisAsync(__ModRedisAsync):
+    def __init__(self,
+                 master: str,
+                 slaves: list,
+                 porta: str,
+                 senha: str,
+                 **kwargs):
+        super().__init__(master=master, slaves=slaves, porta=porta, senha=senha, **kwargs)
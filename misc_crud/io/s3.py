@@ -1,16 +1,37 @@
 import io
+import os
+import mmap
+import time
+import json
 import boto3
+import hashlib
+import tempfile
 import functools
 
+from threading import Lock
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
 from botocore.exceptions import ClientError
 
-from .utils.meta import SingletonMeta
-from .helpers import bytes_para_base64str, base64str_para_bytes
+from ..utils.singleton import SingletonMeta
+from ..utils.helpers import base64str_para_bytes, stream_bytes_para_base64str, stream_base64str_para_bytes
 
 ERRMSG_LEITURA = 'Não foi possível ler o objeto'
 ERRMSG_ESCRITA = 'Não foi possível gravar o objeto'
 
+CODIGOS_NAO_ENCONTRADO = ('404', 'NoSuchKey', 'NotFound')
+
+CODIGOS_NAO_MODIFICADO = ('304', 'NotModified')
+
+MAX_CHAVES_DELETE = 1000
+
+TAMANHO_PARTE = 8388608
+
+TAMANHO_CHUNK = 1048576
+
 
 class PacotaoS3Exception(Exception):
     """
@@ -38,28 +59,381 @@ class ObjetoNaoEncontradoException(PacotaoS3Exception):
     pass
 
 
+def erro_nao_encontrado(excecao) -> bool:
+    """
+    Verifica se um ClientError do boto3 indica objeto inexistente.
+
+    :param ClientError excecao: exceção do boto3
+    :return: True se o erro for de objeto não encontrado
+    :rtype: bool
+    """
+    if not isinstance(excecao, ClientError):
+        return False
+    return str(excecao.response.get('Error', {}).get('Code')) in CODIGOS_NAO_ENCONTRADO
+
+
+class IndiceObjetos:
+    """
+    Índice local das chaves sabidamente existentes no bucket.
+
+    Cada chave expira após `ttl` segundos e o índice guarda no máximo `max_chaves` entradas,
+    descartando as mais antigas. É alimentado pelas escritas/remoções feitas pela própria instância
+    e pelas consultas HEAD bem sucedidas.
+    """
+
+    def __init__(self, ttl: float = 300, max_chaves: int = 100000):
+        self.__TTL = ttl
+        self.__MAX_CHAVES = max_chaves
+        self.__chaves = OrderedDict()
+        self.__lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self.__chaves)
+
+    def contem(self, chave: str) -> bool:
+        """
+        Verifica se a chave está no índice e ainda é válida.
+
+        :param str chave: path do objeto
+        :return: True/False
+        :rtype: bool
+        """
+        with self.__lock:
+            expira_em = self.__chaves.get(chave)
+            if expira_em is None:
+                return False
+            if expira_em < time.monotonic():
+                del self.__chaves[chave]
+                return False
+            return True
+
+    def registrar(self, chave: str):
+        """
+        Registra (ou renova) uma chave no índice.
+
+        :param str chave: path do objeto
+        """
+        with self.__lock:
+            self.__chaves[chave] = time.monotonic() + self.__TTL
+            self.__chaves.move_to_end(chave)
+            while len(self.__chaves) > self.__MAX_CHAVES:
+                self.__chaves.popitem(last=False)
+
+    def remover(self, chave: str):
+        """
+        Remove uma chave do índice.
+
+        :param str chave: path do objeto
+        """
+        with self.__lock:
+            self.__chaves.pop(chave, None)
+
+    def limpar(self):
+        """
+        Esvazia o índice.
+        """
+        with self.__lock:
+            self.__chaves.clear()
+
+
+class CacheObjetos:
+    """
+    Cache local read-through de objetos, em memória e, opcionalmente, em disco.
+
+    As entradas são indexadas por bucket/chave e guardam o ETag do objeto. Cada camada descarta as entradas menos
+    usadas recentemente (LRU) quando o total de bytes ultrapassa o seu limite. Dentro de `validade` segundos desde a
+    última validação a entrada é servida sem acessar a rede; depois disso é revalidada com um GET condicional
+    (If-None-Match).
+
+    Os arquivos em disco são acompanhados de um `.meta` (chave e ETag), de forma que o diretório é reindexado ao
+    criar o cache e as entradas de processos anteriores continuam contando em `max_bytes_disco`.
+
+    Apenas o índice e a ordem LRU são atualizados sob o lock: os arquivos são lidos fora dele e gravados em um arquivo
+    temporário no mesmo diretório, que substitui o anterior com `os.replace`.
+    """
+
+    def __init__(self, max_bytes_memoria: int = 67108864, diretorio: str = None, max_bytes_disco: int = 1073741824,
+                 validade: float = 0):
+        self.__MAX_BYTES_MEMORIA = max_bytes_memoria
+        self.__MAX_BYTES_DISCO = max_bytes_disco if diretorio else 0
+        self.__DIRETORIO = diretorio
+        self.__VALIDADE = validade
+        self.__entradas = OrderedDict()
+        self.__bytes_memoria = 0
+        self.__bytes_disco = 0
+        self.__lock = Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.revalidacoes = 0
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+            self.__reindexar()
+
+    def __arquivo(self, chave: str) -> str:
+        return os.path.join(self.__DIRETORIO, hashlib.sha256(chave.encode('utf-8')).hexdigest())
+
+    @staticmethod
+    def __remover_arquivo(arquivo: str):
+        for path in (arquivo, f'{arquivo}.meta'):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def __temporario(self, dados: bytes) -> str:
+        fd, temporario = tempfile.mkstemp(dir=self.__DIRETORIO, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(dados)
+        except BaseException:
+            self.__remover_arquivo(temporario)
+            raise
+        return temporario
+
+    def __reindexar(self):
+        """
+        Indexa os arquivos deixados no diretório por processos anteriores, do mais antigo para o mais recente, como
+        entradas a revalidar. Arquivos sem `.meta` válido (ou `.meta` sem arquivo) são removidos.
+        """
+        encontrados = []
+        for nome in os.listdir(self.__DIRETORIO):
+            arquivo = os.path.join(self.__DIRETORIO, nome)
+            if nome.endswith('.meta'):
+                if not os.path.exists(arquivo[:-len('.meta')]):
+                    self.__remover_arquivo(arquivo[:-len('.meta')])
+                continue
+            try:
+                with open(f'{arquivo}.meta', encoding='utf-8') as f:
+                    meta = json.load(f)
+                if self.__arquivo(meta['chave']) != arquivo:
+                    raise ValueError(arquivo)
+                encontrados.append((os.path.getmtime(arquivo), meta['chave'], meta.get('etag'), arquivo,
+                                    os.path.getsize(arquivo)))
+            except (OSError, ValueError, KeyError, TypeError):
+                self.__remover_arquivo(arquivo)
+        for _, chave, etag, arquivo, tamanho in sorted(encontrados):
+            self.__entradas[chave] = {'etag': etag, 'tamanho': tamanho, 'validado_em': float('-inf'), 'dados': None,
+                                      'arquivo': arquivo}
+            self.__bytes_disco += tamanho
+        self.__despejar()
+
+    def __descartar(self, chave: str, entrada: dict):
+        if entrada.get('dados') is not None:
+            self.__bytes_memoria -= entrada['tamanho']
+        if entrada.get('arquivo'):
+            self.__bytes_disco -= entrada['tamanho']
+            self.__remover_arquivo(entrada['arquivo'])
+
+    def __despejar(self):
+        for chave, entrada in list(self.__entradas.items()):
+            if self.__bytes_memoria <= self.__MAX_BYTES_MEMORIA:
+                break
+            if entrada.get('dados') is not None:
+                entrada['dados'] = None
+                self.__bytes_memoria -= entrada['tamanho']
+                if not entrada.get('arquivo'):
+                    del self.__entradas[chave]
+        for chave, entrada in list(self.__entradas.items()):
+            if self.__bytes_disco <= self.__MAX_BYTES_DISCO:
+                break
+            if entrada.get('arquivo'):
+                self.__descartar(chave, {'arquivo': entrada['arquivo'], 'tamanho': entrada['tamanho']})
+                entrada['arquivo'] = None
+                if entrada.get('dados') is None:
+                    del self.__entradas[chave]
+
+    def etag(self, chave: str, somente_fresca: bool = False) -> str:
+        """
+        Retorna o ETag da entrada em cache.
+
+        :param str chave: bucket/path do objeto
+        :param bool somente_fresca: considera apenas entradas ainda dentro da validade
+        :return: ETag ou None se a chave não estiver em cache
+        :rtype: str
+        """
+        with self.__lock:
+            entrada = self.__entradas.get(chave)
+            if entrada is None:
+                return None
+            if somente_fresca and time.monotonic() - entrada['validado_em'] > self.__VALIDADE:
+                return None
+            return entrada['etag']
+
+    def ler(self, chave: str) -> bytes:
+        """
+        Lê o conteúdo de uma entrada em cache, promovendo-a para a memória. Conta como acerto.
+
+        :param str chave: bucket/path do objeto
+        :return: bytes do objeto ou None se a chave não estiver em cache
+        :rtype: bytes
+        """
+        with self.__lock:
+            entrada = self.__entradas.get(chave)
+            if entrada is None:
+                return None
+            self.__entradas.move_to_end(chave)
+            dados = entrada.get('dados')
+            if dados is not None:
+                self.acertos += 1
+                return dados
+            arquivo = entrada['arquivo']
+        try:
+            with open(arquivo, 'rb') as f:
+                dados = f.read()
+        except OSError:
+            dados = None
+        with self.__lock:
+            atual = self.__entradas.get(chave) is entrada and entrada['arquivo'] == arquivo
+            if dados is None:
+                if atual:
+                    self.__descartar(chave, self.__entradas.pop(chave))
+                return None
+            if atual and entrada['dados'] is None and entrada['tamanho'] <= self.__MAX_BYTES_MEMORIA:
+                entrada['dados'] = dados
+                self.__bytes_memoria += entrada['tamanho']
+                self.__despejar()
+            self.acertos += 1
+            return dados
+
+    def cabe(self, tamanho: int) -> bool:
+        """
+        Indica se um objeto de `tamanho` bytes pode ser guardado em alguma das camadas.
+
+        :param int tamanho: tamanho do objeto em bytes
+        :return: True/False
+        :rtype: bool
+        """
+        return tamanho is not None and tamanho <= max(self.__MAX_BYTES_MEMORIA, self.__MAX_BYTES_DISCO)
+
+    def guardar(self, chave: str, etag: str, dados: bytes):
+        """
+        Grava (ou substitui) uma entrada no cache. Conta como falha, já que o conteúdo veio da rede.
+
+        :param str chave: bucket/path do objeto
+        :param str etag: ETag do objeto
+        :param bytes dados: bytes do objeto
+        """
+        tamanho = len(dados)
+        temporarios = None
+        if tamanho <= self.__MAX_BYTES_DISCO:
+            temporarios = (self.__temporario(dados),
+                           self.__temporario(json.dumps({'chave': chave, 'etag': etag}).encode('utf-8')))
+        with self.__lock:
+            self.falhas += 1
+            anterior = self.__entradas.pop(chave, None)
+            if anterior is not None:
+                self.__descartar(chave, anterior)
+            entrada = {'etag': etag, 'tamanho': tamanho, 'validado_em': time.monotonic(), 'dados': None,
+                       'arquivo': None}
+            if tamanho <= self.__MAX_BYTES_MEMORIA:
+                entrada['dados'] = dados
+                self.__bytes_memoria += tamanho
+            if temporarios:
+                entrada['arquivo'] = self.__arquivo(chave)
+                os.replace(temporarios[0], entrada['arquivo'])
+                os.replace(temporarios[1], f'{entrada["arquivo"]}.meta')
+                self.__bytes_disco += tamanho
+            if entrada['dados'] is not None or entrada['arquivo']:
+                self.__entradas[chave] = entrada
+                self.__despejar()
+
+    def renovar(self, chave: str):
+        """
+        Marca uma entrada como revalidada junto ao S3 (resposta 304).
+
+        :param str chave: bucket/path do objeto
+        """
+        with self.__lock:
+            entrada = self.__entradas.get(chave)
+            if entrada is not None:
+                entrada['validado_em'] = time.monotonic()
+                self.revalidacoes += 1
+
+    def remover(self, chave: str):
+        """
+        Remove uma entrada do cache.
+
+        :param str chave: bucket/path do objeto
+        """
+        with self.__lock:
+            entrada = self.__entradas.pop(chave, None)
+            if entrada is not None:
+                self.__descartar(chave, entrada)
+
+    def estatisticas(self) -> dict:
+        """
+        Retorna os contadores do cache.
+
+        :return: dict {acertos, falhas, revalidacoes, entradas, bytes_memoria, bytes_disco}
+        :rtype: dict
+        """
+        with self.__lock:
+            return {'acertos': self.acertos, 'falhas': self.falhas, 'revalidacoes': self.revalidacoes,
+                    'entradas': len(self.__entradas), 'bytes_memoria': self.__bytes_memoria,
+                    'bytes_disco': self.__bytes_disco}
+
+
+class LeitorIteravel(io.RawIOBase):
+    """
+    Adapta um iterável de chunks de bytes para um objeto file-like somente leitura, sem acumular o conteúdo.
+
+    Permite enviar ao S3 dados produzidos por um generator; `lidos` guarda a quantidade de bytes consumidos. Como todo
+    RawIOBase, cada `readinto` copia no máximo um chunk; para que `read(n)` retorne n bytes (o s3transfer decide entre
+    multipart e PUT único com uma única leitura de multipart_threshold bytes) use-o dentro de um io.BufferedReader.
+    """
+
+    def __init__(self, chunks):
+        self.__chunks = iter(chunks)
+        self.__pendente = memoryview(b'')
+        self.lidos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self.__pendente:
+            try:
+                self.__pendente = memoryview(next(self.__chunks))
+            except StopIteration:
+                return 0
+        n = min(len(buffer), len(self.__pendente))
+        buffer[:n] = self.__pendente[:n]
+        self.__pendente = self.__pendente[n:]
+        self.lidos += n
+        return n
+
+
 def objeto_existe(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         """
         Decorator para verificar se objeto existe no bucket.
 
+        A verificação é feita pelo índice local (quando habilitado) ou por um HEAD no objeto.
+        Com a verificação prévia desabilitada, o 404 da própria operação é convertido em
+        ObjetoNaoEncontradoException.
+
         :param list args: lista de args
         :param dict kwargs: dict de kwargs
         :return: funcção decorada
         :rtype: func
         :raises: ObjetoNaoEncontradoException
         """
-        if kwargs:
-            s3, path_obj = args[0], kwargs.get('path_objeto', '')
-        elif args:
+        if len(args) > 1:
             s3, path_obj = args[0], args[1]
+        elif args and 'path_objeto' in kwargs:
+            s3, path_obj = args[0], kwargs.get('path_objeto')
         else:
             raise PacotaoS3Exception('Algo errado no decorator')
-        if path_obj in s3.listar_objetos().get('objetos'):
-            return func(*args, **kwargs)
-        else:
+        if s3.verificar_existencia and not s3.existe_objeto(path_obj):
             raise ObjetoNaoEncontradoException(mensagem=f'Objeto {path_obj} não encontrado')
+        try:
+            return func(*args, **kwargs)
+        except PacotaoS3Exception as e:
+            if erro_nao_encontrado(e.excecao):
+                s3.esquecer_objeto(path_obj)
+                raise ObjetoNaoEncontradoException(mensagem=f'Objeto {path_obj} não encontrado', excecao=e.excecao)
+            raise
     return wrapper
 
 
@@ -77,6 +451,7 @@ class __ModS3():
             'endpoint_url': kwargs.get('endpoint', endpoint),
             'config': Config(region_name=kwargs.get('region', region),
                              s3={'addressing_style': 'path'},
+                             max_pool_connections=kwargs.get('max_pool_connections', 10),
                              retries={
                                 'max_attempts': kwargs.get('max_attempts', 1),
                                 'mode': 'standard'})}
@@ -84,6 +459,20 @@ class __ModS3():
         self.__RESOURCE = boto3.resource(**self.__PARAMS)
         self.__VOLUME = volume
         self.__BUCKET = self.__RESOURCE.Bucket(self.__VOLUME)
+        self.__VERIFICAR_EXISTENCIA = kwargs.get('verificar_existencia', True)
+        self.__MAX_WORKERS = kwargs.get('max_workers', kwargs.get('max_pool_connections', 10))
+        self.__TRANSFER = TransferConfig(multipart_threshold=kwargs.get('multipart_threshold', TAMANHO_PARTE),
+                                         multipart_chunksize=kwargs.get('multipart_chunksize', TAMANHO_PARTE),
+                                         max_concurrency=kwargs.get('max_concurrency', 10),
+                                         use_threads=kwargs.get('use_threads', True))
+        self.__INDICE = IndiceObjetos(ttl=kwargs.get('indice_ttl'),
+                                      max_chaves=kwargs.get('indice_max_chaves', 100000)) \
+            if kwargs.get('indice_ttl') else None
+        self.__CACHE = CacheObjetos(max_bytes_memoria=kwargs.get('cache_bytes_memoria', 67108864),
+                                    diretorio=kwargs.get('cache_diretorio'),
+                                    max_bytes_disco=kwargs.get('cache_bytes_disco', 1073741824),
+                                    validade=kwargs.get('cache_validade', 0)) \
+            if kwargs.get('cache', False) else None
 
     @property
     def get_client(self):
@@ -101,28 +490,210 @@ class __ModS3():
     def get_bucket(self):
         return self.__BUCKET
 
-    def listar_objetos(self):
+    @property
+    def get_transfer_config(self):
+        return self.__TRANSFER
+
+    @property
+    def get_indice(self):
+        return self.__INDICE
+
+    @property
+    def get_cache(self):
+        return self.__CACHE
+
+    @property
+    def verificar_existencia(self):
+        return self.__VERIFICAR_EXISTENCIA
+
+    def existe_objeto(self, path_objeto: str) -> bool:
+        """
+        Verifica se um objeto existe no bucket, consultando o índice local e, em seguida, um HEAD no objeto.
+
+        :param str path_objeto: path_objeto
+        :return: True/False
+        :rtype: bool
+        """
+        if self.__INDICE is not None and self.__INDICE.contem(path_objeto):
+            return True
+        if self.__CACHE is not None and self.__CACHE.etag(f'{self.__VOLUME}/{path_objeto}', somente_fresca=True):
+            return True
+        try:
+            self.__CLIENT.head_object(Bucket=self.__VOLUME, Key=path_objeto)
+        except ClientError as e:
+            if erro_nao_encontrado(e):
+                return False
+            raise PacotaoS3Exception(ERRMSG_LEITURA, e)
+        self.registrar_objeto(path_objeto)
+        return True
+
+    def registrar_objeto(self, path_objeto: str):
+        """
+        Registra um objeto no índice local, se habilitado.
+
+        :param str path_objeto: path_objeto
+        """
+        if self.__INDICE is not None:
+            self.__INDICE.registrar(path_objeto)
+
+    def esquecer_objeto(self, path_objeto: str):
+        """
+        Remove um objeto do índice e do cache locais, se habilitados.
+
+        :param str path_objeto: path_objeto
+        """
+        if self.__INDICE is not None:
+            self.__INDICE.remover(path_objeto)
+        if self.__CACHE is not None:
+            self.__CACHE.remover(f'{self.__VOLUME}/{path_objeto}')
+
+    def __objeto_gravado(self, path_objeto: str):
+        """
+        Atualiza o índice e invalida o cache locais após uma escrita da própria instância.
+
+        :param str path_objeto: path_objeto
+        """
+        if self.__CACHE is not None:
+            self.__CACHE.remover(f'{self.__VOLUME}/{path_objeto}')
+        self.registrar_objeto(path_objeto)
+
+    def __get_cacheado(self, path_objeto: str, path_arquivo: str = None) -> bytes:
+        """
+        Lê um objeto através do cache local: entradas dentro da validade são servidas sem acessar a rede, as demais
+        são revalidadas com If-None-Match e, se modificadas, baixadas e gravadas no cache.
+
+        Com `path_arquivo` o objeto também é gravado no arquivo; objetos maiores que os limites do cache são
+        copiados em chunks direto para o arquivo, sem passar pela memória, e nesse caso o retorno é None.
+
+        :param str path_objeto: path_objeto
+        :param str path_arquivo: path do arquivo de destino
+        :return: bytes do objeto
+        :rtype: bytes
+        """
+        chave = f'{self.__VOLUME}/{path_objeto}'
+        if self.__CACHE.etag(chave, somente_fresca=True):
+            dados = self.__CACHE.ler(chave)
+            if dados is not None:
+                return self.__gravar_arquivo(path_arquivo, dados)
+        etag = self.__CACHE.etag(chave)
+        parametros = {'IfNoneMatch': etag} if etag else {}
+        try:
+            resposta = self.__CLIENT.get_object(Bucket=self.__VOLUME, Key=path_objeto, **parametros)
+        except ClientError as e:
+            if etag and str(e.response.get('Error', {}).get('Code')) in CODIGOS_NAO_MODIFICADO:
+                self.__CACHE.renovar(chave)
+                dados = self.__CACHE.ler(chave)
+                if dados is not None:
+                    return self.__gravar_arquivo(path_arquivo, dados)
+                try:
+                    resposta = self.__CLIENT.get_object(Bucket=self.__VOLUME, Key=path_objeto)
+                except ClientError as e:
+                    raise PacotaoS3Exception(ERRMSG_LEITURA, e)
+            else:
+                raise PacotaoS3Exception(ERRMSG_LEITURA, e)
+        if path_arquivo and not self.__CACHE.cabe(resposta.get('ContentLength')):
+            with open(path_arquivo, 'wb') as f:
+                for chunk in resposta['Body'].iter_chunks(chunk_size=TAMANHO_CHUNK):
+                    f.write(chunk)
+            return None
+        dados = resposta['Body'].read()
+        self.__CACHE.guardar(chave, resposta.get('ETag'), dados)
+        return self.__gravar_arquivo(path_arquivo, dados)
+
+    @staticmethod
+    def __gravar_arquivo(path_arquivo: str, dados: bytes) -> bytes:
+        if path_arquivo:
+            with open(path_arquivo, 'wb') as f:
+                f.write(dados)
+        return dados
+
+    def __paginas(self, prefixo: str = '', delimitador: str = '', inicio_apos: str = '', tamanho_pagina: int = 1000):
+        """
+        Iterator sobre as páginas do ListObjectsV2.
+
+        :param str prefixo: prefixo das chaves
+        :param str delimitador: delimitador para agrupar chaves em prefixos comuns
+        :param str inicio_apos: chave a partir da qual a listagem começa (exclusiva)
+        :param int tamanho_pagina: quantidade de chaves por requisição (máximo 1000)
+        :returns: iterator
+        :rtype: iterator(dict)
+        """
+        parametros = {'Bucket': self.__VOLUME, 'Prefix': prefixo}
+        if delimitador:
+            parametros['Delimiter'] = delimitador
+        if inicio_apos:
+            parametros['StartAfter'] = inicio_apos
+        paginador = self.__CLIENT.get_paginator('list_objects_v2')
+        try:
+            for pagina in paginador.paginate(**parametros, PaginationConfig={'PageSize': tamanho_pagina}):
+                yield pagina
+        except ClientError as e:
+            raise PacotaoS3Exception('Não foi possível listar os objetos', e)
+
+    def iterar_objetos(self, prefixo: str = '', delimitador: str = '', inicio_apos: str = '', max_chaves: int = None,
+                       tamanho_pagina: int = 1000):
+        """
+        Lista objetos do bucket de forma preguiçosa, página a página.
+
+        :param str prefixo: prefixo das chaves
+        :param str delimitador: delimitador, as chaves "abaixo" dele não são listadas
+        :param str inicio_apos: chave a partir da qual a listagem começa (exclusiva)
+        :param int max_chaves: quantidade máxima de objetos retornados, None para todos
+        :param int tamanho_pagina: quantidade de chaves por requisição (máximo 1000)
+        :returns: iterator de dict {objeto, tamanho, etag, modificado}
+        :rtype: iterator(dict)
+        """
+        if max_chaves is not None:
+            tamanho_pagina = min(tamanho_pagina, max_chaves)
+            if max_chaves <= 0:
+                return
+        total = 0
+        for pagina in self.__paginas(prefixo=prefixo, delimitador=delimitador, inicio_apos=inicio_apos,
+                                     tamanho_pagina=tamanho_pagina):
+            for o in pagina.get('Contents', []):
+                yield {'objeto': o['Key'], 'tamanho': o.get('Size'), 'etag': o.get('ETag', '').strip('"'),
+                       'modificado': o.get('LastModified')}
+                total += 1
+                if max_chaves is not None and total >= max_chaves:
+                    return
+
+    def iterar_prefixos(self, prefixo: str = '', delimitador: str = '/'):
+        """
+        Lista os prefixos comuns ("diretórios") logo abaixo de um prefixo.
+
+        :param str prefixo: prefixo das chaves
+        :param str delimitador: delimitador
+        :returns: iterator de prefixos
+        :rtype: iterator(str)
+        """
+        for pagina in self.__paginas(prefixo=prefixo, delimitador=delimitador):
+            for p in pagina.get('CommonPrefixes', []):
+                yield p['Prefix']
+
+    def listar_objetos(self, prefixo: str = '') -> dict:
         """
         Lista objetos no bucket.
 
+        :param str prefixo: prefixo das chaves, vazio para o bucket inteiro
         :return: dict {objetos, total}
         :rtype: dict
         """
-        try:
-            objetos = [o.key for o in self.__BUCKET.objects.all()]
-            return {'objetos': objetos, 'total': len(objetos)}
-        except ClientError as e:
-            raise PacotaoS3Exception('Não foi possível remover o objeto', e)
+        objetos = [o['objeto'] for o in self.iterar_objetos(prefixo=prefixo)]
+        return {'objetos': objetos, 'total': len(objetos)}
 
-    def pesquisar_objeto(self, path_objeto: str) -> dict:
+    def pesquisar_objeto(self, path_objeto: str, prefixo: str = '') -> dict:
         """
         Efetua uma pesquisa dentre os objetos do bucket.
 
+        O `prefixo` é resolvido no servidor, restringindo a listagem ao intervalo de chaves relevante;
+        `path_objeto` é então buscado como substring nas chaves retornadas.
+
         :param str path_objeto: path_objeto
+        :param str prefixo: prefixo das chaves
         :return: dict {objetos, total}
         :rtype: dict
         """
-        objetos = [o for o in self.listar_objetos().get('objetos') if path_objeto in o]
+        objetos = [o['objeto'] for o in self.iterar_objetos(prefixo=prefixo) if path_objeto in o['objeto']]
         return {'objetos': objetos, 'total': len(objetos)}
 
     @objeto_existe
@@ -137,6 +708,7 @@ class __ModS3():
         """
         try:
             retorno = self.__CLIENT.delete_object(Bucket=self.__VOLUME, Key=path_objeto)
+            self.esquecer_objeto(path_objeto)
             return {'objeto': path_objeto, 'status': retorno.get('ResponseMetadata').get('HTTPStatusCode')}
         except ClientError as e:
             raise PacotaoS3Exception('Não foi possível remover o objeto', e)
@@ -151,15 +723,129 @@ class __ModS3():
         :rtype: dict
         :raises: ObjetoNaoEncontradoException
         """
+        if self.__CACHE is not None:
+            return {'objeto': path_objeto, 'bytes': self.__get_cacheado(path_objeto)}
         buffer = io.BytesIO()
         try:
-            self.__CLIENT.download_fileobj(Bucket=self.__VOLUME, Key=path_objeto, Fileobj=buffer)
-            buffer.flush()
-            buffer.seek(0)
-            return {'objeto': path_objeto, 'bytes': buffer.read()}
+            self.__CLIENT.download_fileobj(Bucket=self.__VOLUME, Key=path_objeto, Fileobj=buffer,
+                                           Config=self.__TRANSFER)
+            return {'objeto': path_objeto, 'bytes': buffer.getvalue()}
         except ClientError as e:
             raise PacotaoS3Exception(ERRMSG_LEITURA, e)
 
+    @objeto_existe
+    def download_intervalo(self, path_objeto: str, inicio: int, fim: int = None) -> dict:
+        """
+        Retorna os bytes [inicio, fim) de um objeto (ranged GET).
+
+        :param str path_objeto: path_objeto
+        :param int inicio: posição inicial, inclusiva
+        :param int fim: posição final, exclusiva, None para ler até o fim do objeto
+        :return: dict {objeto, inicio, bytes}
+        :rtype: dict
+        :raises: ObjetoNaoEncontradoException, PacotaoS3Exception para intervalos inválidos
+        """
+        if inicio < 0 or (fim is not None and fim < inicio):
+            raise PacotaoS3Exception(f'Intervalo inválido {inicio}-{fim} de {path_objeto}')
+        if fim == inicio:
+            return {'objeto': path_objeto, 'inicio': inicio, 'bytes': b''}
+        intervalo = f'bytes={inicio}-' if fim is None else f'bytes={inicio}-{fim - 1}'
+        try:
+            body = self.__CLIENT.get_object(Bucket=self.__VOLUME, Key=path_objeto, Range=intervalo)['Body']
+            return {'objeto': path_objeto, 'inicio': inicio, 'bytes': body.read()}
+        except ClientError as e:
+            raise PacotaoS3Exception(ERRMSG_LEITURA, e)
+
+    def __ler_parte(self, path_objeto: str, etag: str, destino: memoryview, inicio: int, fim: int,
+                    chunk_size: int) -> dict:
+        """
+        Lê o intervalo [inicio, fim) de um objeto diretamente para a fatia correspondente de `destino`.
+
+        :param str path_objeto: path_objeto
+        :param str etag: ETag esperado, garante que todas as partes vêm da mesma versão do objeto
+        :param memoryview destino: buffer gravável do tamanho do objeto
+        :param int inicio: posição inicial, inclusiva
+        :param int fim: posição final, exclusiva
+        :param int chunk_size: quantidade de bytes lidos da rede por iteração
+        :return: dict {objeto, inicio, tamanho}
+        :rtype: dict
+        """
+        try:
+            body = self.__CLIENT.get_object(Bucket=self.__VOLUME, Key=path_objeto, Range=f'bytes={inicio}-{fim - 1}',
+                                            IfMatch=etag)['Body']
+        except ClientError as e:
+            raise PacotaoS3Exception(ERRMSG_LEITURA, e)
+        posicao = inicio
+        for chunk in self.__stream_chunks(body_bytes=body, chunk_size=chunk_size):
+            destino[posicao:posicao + len(chunk)] = chunk
+            posicao += len(chunk)
+        if posicao != fim:
+            raise PacotaoS3Exception(f'Leitura incompleta do intervalo {inicio}-{fim} de {path_objeto}')
+        return {'objeto': path_objeto, 'inicio': inicio, 'tamanho': fim - inicio}
+
+    def download_paralelo(self, path_objeto: str, path_arquivo: str = None, destino=None,
+                          tamanho_parte: int = TAMANHO_PARTE, max_workers: int = None) -> dict:
+        """
+        Realiza o download de um objeto grande em intervalos paralelos, gravando cada parte diretamente no destino.
+
+        O destino é, nesta ordem: o arquivo `path_arquivo` (mapeado em memória), o buffer gravável `destino`
+        (bytearray/memoryview pré-alocado) ou um bytearray alocado com o tamanho do objeto.
+
+        :param str path_objeto: path_objeto
+        :param str path_arquivo: path do arquivo local de saída
+        :param destino: buffer gravável com pelo menos o tamanho do objeto
+        :param int tamanho_parte: tamanho de cada intervalo, 8 Mb por padrão
+        :param int max_workers: quantidade de threads
+        :return: dict {objeto, tamanho} mais {arquivo} ou {bytes}
+        :rtype: dict
+        :raises: ObjetoNaoEncontradoException
+        """
+        try:
+            metadados = self.__CLIENT.head_object(Bucket=self.__VOLUME, Key=path_objeto)
+            tamanho, etag = metadados['ContentLength'], metadados['ETag']
+        except ClientError as e:
+            if erro_nao_encontrado(e):
+                self.esquecer_objeto(path_objeto)
+                raise ObjetoNaoEncontradoException(mensagem=f'Objeto {path_objeto} não encontrado', excecao=e)
+            raise PacotaoS3Exception(ERRMSG_LEITURA, e)
+        self.registrar_objeto(path_objeto)
+
+        mapa = None
+        if path_arquivo:
+            with open(path_arquivo, 'wb') as f:
+                f.truncate(tamanho)
+            if tamanho:
+                fd = os.open(path_arquivo, os.O_RDWR)
+                try:
+                    mapa = mmap.mmap(fd, tamanho)
+                finally:
+                    os.close(fd)
+            buffer = mapa if mapa is not None else bytearray()
+        elif destino is not None:
+            if len(memoryview(destino)) < tamanho:
+                raise PacotaoS3Exception(f'Destino menor que o objeto {path_objeto} ({tamanho} bytes)')
+            buffer = destino
+        else:
+            buffer = bytearray(tamanho)
+
+        visao = memoryview(buffer)
+        chunk_size = min(tamanho_parte, TAMANHO_CHUNK)
+        intervalos = ((path_objeto, etag, visao, i, min(i + tamanho_parte, tamanho), chunk_size)
+                      for i in range(0, tamanho, tamanho_parte))
+        try:
+            erros = [r['erro'] for r in self.executar_lote(self.__ler_parte, intervalos, max_workers=max_workers)
+                     if 'erro' in r]
+        finally:
+            visao.release()
+            if mapa is not None:
+                mapa.flush()
+                mapa.close()
+        if erros:
+            raise erros[0]
+        if path_arquivo:
+            return {'objeto': path_objeto, 'arquivo': path_arquivo, 'tamanho': tamanho}
+        return {'objeto': path_objeto, 'bytes': buffer, 'tamanho': tamanho}
+
     @objeto_existe
     def download_b64str(self, path_objeto: str) -> dict:
         """
@@ -171,10 +857,9 @@ class __ModS3():
         :raises: ObjetoNaoEncontradoException
         """
         try:
-            objeto = self.__RESOURCE.Object(bucket_name=self.__VOLUME, key=path_objeto)
-            bytes_objeto = objeto.get()['Body'].read()
-            bytes_objeto = bytes_para_base64str(bytes_objeto)
-            return {'objeto': path_objeto, 'b64str': bytes_objeto}
+            body_bytes = self.__RESOURCE.Object(bucket_name=self.__VOLUME, key=path_objeto).get()['Body']
+            chunks = self.__stream_chunks(body_bytes=body_bytes, chunk_size=TAMANHO_CHUNK - TAMANHO_CHUNK % 3)
+            return {'objeto': path_objeto, 'b64str': ''.join(stream_bytes_para_base64str(chunks))}
         except ClientError as e:
             raise PacotaoS3Exception(ERRMSG_LEITURA, e)
 
@@ -190,8 +875,11 @@ class __ModS3():
         :rtype: dict
         :raises: ObjetoNaoEncontradoException
         """
+        if self.__CACHE is not None:
+            self.__get_cacheado(path_objeto, path_arquivo=path_arquivo)
+            return {'objeto': path_objeto, 'arquivo': path_arquivo}
         try:
-            self.__CLIENT.download_file(self.__VOLUME, path_objeto, path_arquivo)
+            self.__CLIENT.download_file(self.__VOLUME, path_objeto, path_arquivo, Config=self.__TRANSFER)
             return {'objeto': path_objeto, 'arquivo': path_arquivo}
         except ClientError as e:
             raise PacotaoS3Exception('Não foi possível gravar o arquivo localmente', e)
@@ -210,7 +898,8 @@ class __ModS3():
         arquivo_bytes = arquivo.file._file
         tamanho_objeto = arquivo.file._max_size
         try:
-            self.__CLIENT.upload_fileobj(arquivo_bytes, self.__VOLUME, path_objeto)
+            self.__CLIENT.upload_fileobj(arquivo_bytes, self.__VOLUME, path_objeto, Config=self.__TRANSFER)
+            self.__objeto_gravado(path_objeto)
             return {'objeto': path_objeto, 'tamanho': tamanho_objeto}
         except ClientError as e:
             raise PacotaoS3Exception('Não foi possível efetuar o upload', e)
@@ -226,7 +915,8 @@ class __ModS3():
         :raises: NiaBBS3Exception
         """
         try:
-            self.__CLIENT.upload_fileobj(io.BytesIO(bytes_objeto), self.__VOLUME, path_objeto)
+            self.__CLIENT.upload_fileobj(io.BytesIO(bytes_objeto), self.__VOLUME, path_objeto, Config=self.__TRANSFER)
+            self.__objeto_gravado(path_objeto)
             return {'objeto': path_objeto, 'tamanho': len(bytes_objeto)}
         except ClientError as e:
             raise PacotaoS3Exception(ERRMSG_ESCRITA, e)
@@ -243,11 +933,181 @@ class __ModS3():
         """
         bytes_objeto = base64str_para_bytes(base64str_objeto)
         try:
-            self.__CLIENT.upload_fileobj(io.BytesIO(bytes_objeto), self.__VOLUME, path_objeto)
+            self.__CLIENT.upload_fileobj(io.BytesIO(bytes_objeto), self.__VOLUME, path_objeto, Config=self.__TRANSFER)
+            self.__objeto_gravado(path_objeto)
             return {'objeto': path_objeto, 'tamanho': len(bytes_objeto)}
         except ClientError as e:
             raise PacotaoS3Exception(ERRMSG_ESCRITA, e)
 
+    def grava_stream(self, path_objeto: str, origem, chunk_size: int = TAMANHO_CHUNK,
+                     transfer_config: TransferConfig = None) -> dict:
+        """
+        Realiza a escrita de um objeto no bucket a partir de uma fonte em streaming, sem carregar o conteúdo
+        inteiro em memória. Acima do multipart_threshold o envio é feito em multipart.
+
+        :param str path_objeto: path objeto no destino
+        :param origem: iterável/generator de chunks de bytes, objeto file-like com .read() ou file descriptor (int)
+        :param int chunk_size: quantidade de bytes lidos por iteração de objetos file-like/file descriptors
+        :param TransferConfig transfer_config: sobrescreve a configuração de transferência da instância
+        :return: dict {objeto, tamanho}, tamanho em bytes
+        :rtype: dict
+        :raises: PacotaoS3Exception
+        """
+        if isinstance(origem, int):
+            origem = open(origem, 'rb', buffering=0, closefd=False)
+        if hasattr(origem, 'read'):
+            origem = iter(functools.partial(origem.read, chunk_size), b'')
+        leitor = LeitorIteravel(origem)
+        try:
+            self.__CLIENT.upload_fileobj(io.BufferedReader(leitor, buffer_size=chunk_size), self.__VOLUME, path_objeto,
+                                         Config=transfer_config or self.__TRANSFER)
+            self.__objeto_gravado(path_objeto)
+            return {'objeto': path_objeto, 'tamanho': leitor.lidos}
+        except ClientError as e:
+            raise PacotaoS3Exception(ERRMSG_ESCRITA, e)
+
+    def grava_b64_stream(self, path_objeto: str, chunks_b64str, transfer_config: TransferConfig = None) -> dict:
+        """
+        Decodifica, de forma incremental, chunks de str b64 e realiza a escrita dos bytes no bucket.
+
+        :param str path_objeto: path objeto no destino
+        :param chunks_b64str: str base64 ou iterável de chunks de str base64
+        :param TransferConfig transfer_config: sobrescreve a configuração de transferência da instância
+        :return: dict {objeto, tamanho}, tamanho em bytes
+        :rtype: dict
+        :raises: PacotaoS3Exception
+        """
+        if isinstance(chunks_b64str, str):
+            texto = chunks_b64str
+            chunks_b64str = (texto[i:i + TAMANHO_CHUNK] for i in range(0, len(texto), TAMANHO_CHUNK))
+        return self.grava_stream(path_objeto, stream_base64str_para_bytes(chunks_b64str),
+                                 transfer_config=transfer_config)
+
+    def executar_lote(self, funcao, itens, max_workers: int = None):
+        """
+        Executa `funcao` para cada item em um pool de threads limitado, retornando os resultados à medida que
+        são concluídos. No máximo 2 * max_workers itens ficam pendentes, de forma que `itens` pode ser um iterator
+        arbitrariamente grande.
+
+        Se o consumidor parar de iterar, os itens ainda não iniciados são cancelados ao fechar o iterator; apenas as
+        requisições já em andamento (no máximo max_workers) são aguardadas.
+
+        :param callable funcao: função que recebe um item e retorna um dict com a chave 'objeto'
+        :param iterable itens: itens a processar, cada item é (path_objeto, *args)
+        :param int max_workers: quantidade de threads, por padrão o max_pool_connections do client
+        :returns: iterator de dict, com a chave 'erro' (qualquer exceção, inclusive BotoCoreError) nos itens que
+            falharam
+        :rtype: iterator(dict)
+        """
+        max_workers = max_workers or self.__MAX_WORKERS
+        itens = iter(itens)
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        pendentes = {}
+        try:
+            while True:
+                for item in itens:
+                    pendentes[executor.submit(funcao, *item)] = item[0]
+                    if len(pendentes) >= 2 * max_workers:
+                        break
+                if not pendentes:
+                    return
+                concluidos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                for futuro in concluidos:
+                    path_objeto = pendentes.pop(futuro)
+                    try:
+                        resultado = futuro.result()
+                    except Exception as e:
+                        resultado = {'objeto': path_objeto, 'erro': e}
+                    yield resultado
+        finally:
+            for futuro in pendentes:
+                futuro.cancel()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def download_lote(self, paths_objetos, max_workers: int = None):
+        """
+        Retorna os bytes de vários objetos, em paralelo.
+
+        :param iterable paths_objetos: paths dos objetos
+        :param int max_workers: quantidade de threads
+        :returns: iterator de dict {objeto, bytes} ou {objeto, erro}, na ordem de conclusão
+        :rtype: iterator(dict)
+        """
+        return self.executar_lote(self.download_bytes, ((p,) for p in paths_objetos), max_workers=max_workers)
+
+    def grava_lote(self, objetos, max_workers: int = None):
+        """
+        Realiza a escrita de vários objetos no bucket, em paralelo.
+
+        :param iterable objetos: pares (path_objeto, bytes_objeto)
+        :param int max_workers: quantidade de threads
+        :returns: iterator de dict {objeto, tamanho} ou {objeto, erro}, na ordem de conclusão
+        :rtype: iterator(dict)
+        """
+        return self.executar_lote(self.grava_bytes, objetos, max_workers=max_workers)
+
+    def __apagar_bloco(self, chaves: list) -> dict:
+        """
+        Apaga até MAX_CHAVES_DELETE objetos com uma única requisição DeleteObjects.
+
+        :param list chaves: paths dos objetos
+        :return: dict {objeto, apagados, erros}
+        :rtype: dict
+        """
+        try:
+            retorno = self.__CLIENT.delete_objects(Bucket=self.__VOLUME,
+                                                   Delete={'Objects': [{'Key': k} for k in chaves], 'Quiet': True})
+            erros = [{'objeto': e.get('Key'), 'codigo': e.get('Code'), 'mensagem': e.get('Message')}
+                     for e in retorno.get('Errors', [])]
+        except ClientError as e:
+            codigo = e.response.get('Error', {}).get('Code')
+            erros = [{'objeto': k, 'codigo': codigo, 'mensagem': str(e)} for k in chaves]
+        falhas = {e['objeto'] for e in erros}
+        apagados = [k for k in chaves if k not in falhas]
+        for k in apagados:
+            self.esquecer_objeto(k)
+        return {'objeto': chaves, 'apagados': apagados, 'erros': erros}
+
+    def apagar_lote(self, paths_objetos=None, prefixo: str = None, max_workers: int = None) -> dict:
+        """
+        Apaga vários objetos do bucket, a partir de uma lista de paths ou de um prefixo.
+
+        As chaves são agrupadas em blocos de MAX_CHAVES_DELETE (DeleteObjects) e os blocos são enviados em paralelo.
+        Chaves inexistentes não são consideradas erro pelo S3. Se a requisição de um bloco falhar (por exemplo,
+        erro de conexão), todas as chaves do bloco são reportadas em `erros`.
+
+        :param iterable paths_objetos: paths dos objetos
+        :param str prefixo: prefixo dos objetos, usado quando paths_objetos não é informado
+        :param int max_workers: quantidade de threads
+        :return: dict {apagados, erros, total}, erros como lista de dict {objeto, codigo, mensagem}
+        :rtype: dict
+        :raises: PacotaoS3Exception
+        """
+        if paths_objetos is None:
+            if prefixo is None:
+                raise PacotaoS3Exception('Informe paths_objetos ou prefixo')
+            paths_objetos = (o['objeto'] for o in self.iterar_objetos(prefixo=prefixo))
+
+        def blocos():
+            bloco = []
+            for path_objeto in paths_objetos:
+                bloco.append(path_objeto)
+                if len(bloco) == MAX_CHAVES_DELETE:
+                    yield (bloco,)
+                    bloco = []
+            if bloco:
+                yield (bloco,)
+
+        apagados, erros = [], []
+        for resultado in self.executar_lote(self.__apagar_bloco, blocos(), max_workers=max_workers):
+            if 'erro' in resultado:
+                erros.extend({'objeto': k, 'codigo': type(resultado['erro']).__name__,
+                              'mensagem': str(resultado['erro'])} for k in resultado['objeto'])
+                continue
+            apagados.extend(resultado.get('apagados', []))
+            erros.extend(resultado.get('erros', []))
+        return {'apagados': apagados, 'erros': erros, 'total': len(apagados)}
+
     @staticmethod
     def __stream_chunks(body_bytes: bytes, chunk_size: int) -> bytes:
         """
@@ -283,16 +1143,31 @@ class __ModS3():
         except ClientError as e:
             raise PacotaoS3Exception(ERRMSG_LEITURA, e)
 
+    def stream_b64str(self, path_objeto: str, chunk_size=TAMANHO_CHUNK):
+        """
+        Realiza o streamming de um objeto do bucket já codificado em str base64.
+
+        :param str path_objeto: path_objeto
+        :param int chunk_size: quantidade de bytes lidos por iteração, arredondada para múltiplo de 3
+        :return: chunks da str base64 do objeto
+        :rtype: iterator(str)
+        :raises: ObjetoNaoEncontradoException
+        """
+        chunk_size = max(3, chunk_size - chunk_size % 3)
+        return stream_bytes_para_base64str(self.stream_objeto(path_objeto, chunk_size=chunk_size))
+
 
 class __ModS3Singleton(__ModS3, metaclass=SingletonMeta):
     pass
 
 
 class MultiArmazenamentoS3(__ModS3):
-    def __init__(self, access_key: str, secret_key: str, endpoint: str, region: str, volume: str):
-        super().__init__(access_key=access_key, secret_key=secret_key, endpoint=endpoint, region=region, volume=volume)
+    def __init__(self, access_key: str, secret_key: str, endpoint: str, region: str, volume: str, **kwargs):
+        super().__init__(access_key=access_key, secret_key=secret_key, endpoint=endpoint, region=region, volume=volume,
+                         **kwargs)
 
 
 class ArmazenamentoS3(__ModS3Singleton):
-    def __init__(self, access_key: str, secret_key: str, endpoint: str, region: str, volume: str):
-        super().__init__(access_key=access_key, secret_key=secret_key, endpoint=endpoint, region=region, volume=volume)
+    def __init__(self, access_key: str, secret_key: str, endpoint: str, region: str, volume: str, **kwargs):
+        super().__init__(access_key=access_key, secret_key=secret_key, endpoint=endpoint, region=region, volume=volume,
+                         **kwargs)
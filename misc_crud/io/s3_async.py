@@ -0,0 +1,503 @@
+import asyncio
+import functools
+
+from aiobotocore.config import AioConfig
+from aiobotocore.session import get_session
+from botocore.exceptions import ClientError
+
+from ..utils.singleton import SingletonMeta
+from ..utils.helpers import bytes_para_base64str, base64str_para_bytes, base64str_parcial
+from .s3 import (PacotaoS3Exception, ObjetoNaoEncontradoException, erro_nao_encontrado, ERRMSG_LEITURA,
+                 ERRMSG_ESCRITA, MAX_CHAVES_DELETE, TAMANHO_CHUNK)
+
+
+def objeto_existe_async(func):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        """
+        Decorator para verificar se objeto existe no bucket, versão asyncio.
+
+        :param list args: lista de args
+        :param dict kwargs: dict de kwargs
+        :return: funcção decorada
+        :rtype: func
+        :raises: ObjetoNaoEncontradoException
+        """
+        if len(args) > 1:
+            s3, path_obj = args[0], args[1]
+        elif args and 'path_objeto' in kwargs:
+            s3, path_obj = args[0], kwargs.get('path_objeto')
+        else:
+            raise PacotaoS3Exception('Algo errado no decorator')
+        if s3.verificar_existencia and not await s3.existe_objeto(path_obj):
+            raise ObjetoNaoEncontradoException(mensagem=f'Objeto {path_obj} não encontrado')
+        try:
+            return await func(*args, **kwargs)
+        except PacotaoS3Exception as e:
+            if erro_nao_encontrado(e.excecao):
+                raise ObjetoNaoEncontradoException(mensagem=f'Objeto {path_obj} não encontrado', excecao=e.excecao)
+            raise
+    return wrapper
+
+
+class __ModS3Async():
+    """
+    Classe para modelar conexão e interação com solução de armazenamento S3, versão asyncio (aiobotocore).
+
+    O client é aberto em `conectar` (ou ao entrar no `async with`) e deve ser fechado com `fechar`.
+    """
+
+    def __init__(self, access_key: str, secret_key: str, endpoint: str, region: str, volume: str, **kwargs):
+        self.__PARAMS = {
+            'service_name': 's3',
+            'use_ssl': kwargs.get('use_ssl', False),
+            'aws_access_key_id': kwargs.get('access_key', access_key),
+            'aws_secret_access_key': kwargs.get('secret_key', secret_key),
+            'endpoint_url': kwargs.get('endpoint', endpoint),
+            'config': AioConfig(region_name=kwargs.get('region', region),
+                                s3={'addressing_style': 'path'},
+                                max_pool_connections=kwargs.get('max_pool_connections', 10),
+                                retries={
+                                    'max_attempts': kwargs.get('max_attempts', 1),
+                                    'mode': 'standard'})}
+        self.__SESSION = get_session()
+        self.__CONTEXTO = None
+        self.__CLIENT = None
+        self.__VOLUME = volume
+        self.__VERIFICAR_EXISTENCIA = kwargs.get('verificar_existencia', True)
+        self.__LIMITE = kwargs.get('max_workers', kwargs.get('max_pool_connections', 10))
+
+    @property
+    def get_client(self):
+        return self.__CLIENT
+
+    @property
+    def get_volume(self):
+        return self.__VOLUME
+
+    @property
+    def verificar_existencia(self):
+        return self.__VERIFICAR_EXISTENCIA
+
+    async def conectar(self):
+        """
+        Abre o client aiobotocore, caso ainda não esteja aberto.
+
+        :return: self
+        """
+        if self.__CLIENT is None:
+            self.__CONTEXTO = self.__SESSION.create_client(**self.__PARAMS)
+            self.__CLIENT = await self.__CONTEXTO.__aenter__()
+        return self
+
+    async def fechar(self):
+        """
+        Fecha o client aiobotocore.
+        """
+        if self.__CONTEXTO is not None:
+            await self.__CONTEXTO.__aexit__(None, None, None)
+        self.__CONTEXTO, self.__CLIENT = None, None
+
+    async def __aenter__(self):
+        return await self.conectar()
+
+    async def __aexit__(self, type, value, traceback):
+        await self.fechar()
+
+    async def existe_objeto(self, path_objeto: str) -> bool:
+        """
+        Verifica se um objeto existe no bucket, com um HEAD no objeto.
+
+        :param str path_objeto: path_objeto
+        :return: True/False
+        :rtype: bool
+        """
+        try:
+            await self.__CLIENT.head_object(Bucket=self.__VOLUME, Key=path_objeto)
+            return True
+        except ClientError as e:
+            if erro_nao_encontrado(e):
+                return False
+            raise PacotaoS3Exception(ERRMSG_LEITURA, e)
+
+    async def iterar_objetos(self, prefixo: str = '', delimitador: str = '', inicio_apos: str = '',
+                             max_chaves: int = None, tamanho_pagina: int = 1000):
+        """
+        Lista objetos do bucket de forma preguiçosa, página a página.
+
+        :param str prefixo: prefixo das chaves
+        :param str delimitador: delimitador, as chaves "abaixo" dele não são listadas
+        :param str inicio_apos: chave a partir da qual a listagem começa (exclusiva)
+        :param int max_chaves: quantidade máxima de objetos retornados, None para todos
+        :param int tamanho_pagina: quantidade de chaves por requisição (máximo 1000)
+        :returns: async iterator de dict {objeto, tamanho, etag, modificado}
+        :rtype: async iterator(dict)
+        """
+        if max_chaves is not None:
+            tamanho_pagina = min(tamanho_pagina, max_chaves)
+            if max_chaves <= 0:
+                return
+        parametros = {'Bucket': self.__VOLUME, 'Prefix': prefixo}
+        if delimitador:
+            parametros['Delimiter'] = delimitador
+        if inicio_apos:
+            parametros['StartAfter'] = inicio_apos
+        total = 0
+        paginador = self.__CLIENT.get_paginator('list_objects_v2')
+        try:
+            async for pagina in paginador.paginate(**parametros, PaginationConfig={'PageSize': tamanho_pagina}):
+                for o in pagina.get('Contents', []):
+                    yield {'objeto': o['Key'], 'tamanho': o.get('Size'), 'etag': o.get('ETag', '').strip('"'),
+                           'modificado': o.get('LastModified')}
+                    total += 1
+                    if max_chaves is not None and total >= max_chaves:
+                        return
+        except ClientError as e:
+            raise PacotaoS3Exception('Não foi possível listar os objetos', e)
+
+    async def listar_objetos(self, prefixo: str = '') -> dict:
+        """
+        Lista objetos no bucket.
+
+        :param str prefixo: prefixo das chaves, vazio para o bucket inteiro
+        :return: dict {objetos, total}
+        :rtype: dict
+        """
+        objetos = [o['objeto'] async for o in self.iterar_objetos(prefixo=prefixo)]
+        return {'objetos': objetos, 'total': len(objetos)}
+
+    async def pesquisar_objeto(self, path_objeto: str, prefixo: str = '') -> dict:
+        """
+        Efetua uma pesquisa dentre os objetos do bucket.
+
+        :param str path_objeto: path_objeto
+        :param str prefixo: prefixo das chaves, resolvido no servidor
+        :return: dict {objetos, total}
+        :rtype: dict
+        """
+        objetos = [o['objeto'] async for o in self.iterar_objetos(prefixo=prefixo) if path_objeto in o['objeto']]
+        return {'objetos': objetos, 'total': len(objetos)}
+
+    @objeto_existe_async
+    async def apagar_objeto(self, path_objeto: str) -> dict:
+        """
+        Apaga um objeto do bucket.
+
+        :param str path_objeto: path_objeto
+        :return: dict {objeto, status}
+        :rtype: dict
+        :raises: ObjetoNaoEncontradoException
+        """
+        try:
+            retorno = await self.__CLIENT.delete_object(Bucket=self.__VOLUME, Key=path_objeto)
+            return {'objeto': path_objeto, 'status': retorno.get('ResponseMetadata').get('HTTPStatusCode')}
+        except ClientError as e:
+            raise PacotaoS3Exception('Não foi possível remover o objeto', e)
+
+    async def __apagar_bloco(self, chaves: list) -> dict:
+        """
+        Apaga até MAX_CHAVES_DELETE objetos com uma única requisição DeleteObjects.
+
+        :param list chaves: paths dos objetos
+        :return: dict {objeto, apagados, erros}
+        :rtype: dict
+        """
+        try:
+            retorno = await self.__CLIENT.delete_objects(Bucket=self.__VOLUME,
+                                                         Delete={'Objects': [{'Key': k} for k in chaves],
+                                                                 'Quiet': True})
+            erros = [{'objeto': e.get('Key'), 'codigo': e.get('Code'), 'mensagem': e.get('Message')}
+                     for e in retorno.get('Errors', [])]
+        except ClientError as e:
+            codigo = e.response.get('Error', {}).get('Code')
+            erros = [{'objeto': k, 'codigo': codigo, 'mensagem': str(e)} for k in chaves]
+        falhas = {e['objeto'] for e in erros}
+        return {'objeto': chaves, 'apagados': [k for k in chaves if k not in falhas], 'erros': erros}
+
+    async def apagar_lote(self, paths_objetos=None, prefixo: str = None, limite: int = None) -> dict:
+        """
+        Apaga vários objetos do bucket, a partir de uma lista de paths ou de um prefixo, em blocos DeleteObjects
+        concorrentes. Se a requisição de um bloco falhar (por exemplo, erro de conexão), todas as chaves do bloco são
+        reportadas em `erros`.
+
+        :param iterable paths_objetos: paths dos objetos (iterável síncrono ou assíncrono)
+        :param str prefixo: prefixo dos objetos, usado quando paths_objetos não é informado; a listagem é consumida
+            sob demanda, um bloco por vez
+        :param int limite: quantidade máxima de requisições simultâneas
+        :return: dict {apagados, erros, total}
+        :rtype: dict
+        :raises: PacotaoS3Exception
+        """
+        if paths_objetos is None:
+            if prefixo is None:
+                raise PacotaoS3Exception('Informe paths_objetos ou prefixo')
+            paths_objetos = (o['objeto'] async for o in self.iterar_objetos(prefixo=prefixo))
+
+        async def blocos():
+            bloco = []
+            if hasattr(paths_objetos, '__aiter__'):
+                async for path_objeto in paths_objetos:
+                    bloco.append(path_objeto)
+                    if len(bloco) == MAX_CHAVES_DELETE:
+                        yield (bloco,)
+                        bloco = []
+            else:
+                for path_objeto in paths_objetos:
+                    bloco.append(path_objeto)
+                    if len(bloco) == MAX_CHAVES_DELETE:
+                        yield (bloco,)
+                        bloco = []
+            if bloco:
+                yield (bloco,)
+
+        apagados, erros = [], []
+        async for resultado in self.executar_lote(self.__apagar_bloco, blocos(), limite=limite):
+            if 'erro' in resultado:
+                erros.extend({'objeto': k, 'codigo': type(resultado['erro']).__name__,
+                              'mensagem': str(resultado['erro'])} for k in resultado['objeto'])
+                continue
+            apagados.extend(resultado.get('apagados', []))
+            erros.extend(resultado.get('erros', []))
+        return {'apagados': apagados, 'erros': erros, 'total': len(apagados)}
+
+    @objeto_existe_async
+    async def download_bytes(self, path_objeto: str) -> dict:
+        """
+        Retorna os bytes de um objeto.
+
+        :param str path_objeto: path_objeto
+        :return: dict {objeto, bytes}
+        :rtype: dict
+        :raises: ObjetoNaoEncontradoException
+        """
+        try:
+            resposta = await self.__CLIENT.get_object(Bucket=self.__VOLUME, Key=path_objeto)
+            async with resposta['Body'] as body:
+                return {'objeto': path_objeto, 'bytes': await body.read()}
+        except ClientError as e:
+            raise PacotaoS3Exception(ERRMSG_LEITURA, e)
+
+    @objeto_existe_async
+    async def download_b64str(self, path_objeto: str) -> dict:
+        """
+        Retona os bytes de um objeto do bucket como str base 64.
+
+        :param str path_objeto: path_objeto
+        :return: dict {objeto, b64str}
+        :rtype: dict
+        :raises: ObjetoNaoEncontradoException
+        """
+        partes = [parte async for parte in self.stream_b64str(path_objeto)]
+        return {'objeto': path_objeto, 'b64str': ''.join(partes)}
+
+    @objeto_existe_async
+    async def download_arquivo(self, path_objeto: str, path_arquivo: str, chunk_size: int = TAMANHO_CHUNK) -> dict:
+        """
+        Retona os bytes de um objeto do bucket para arquivo no file system.
+
+        :param str path_objeto: path_objeto
+        :param str path_arquivo: path_arquivo
+        :param int chunk_size: quantidade de bytes lidos por iteração
+        :return: dict {objeto, arquivo}
+        :rtype: dict
+        :raises: ObjetoNaoEncontradoException
+        """
+        try:
+            with open(path_arquivo, 'wb') as f:
+                async for chunk in self.__stream_chunks(path_objeto, chunk_size):
+                    f.write(chunk)
+            return {'objeto': path_objeto, 'arquivo': path_arquivo}
+        except ClientError as e:
+            raise PacotaoS3Exception('Não foi possível gravar o arquivo localmente', e)
+
+    async def upload_arquivo(self, path_objeto: str, arquivo) -> dict:
+        """
+        Efetua o upload de um arquivo para o bucket.
+
+        :param str path_objeto: path objeto no destino
+        :param fastapi.UploadFile arquivo: arquivo
+        :return: dict {objeto, tamanho}, tamanho em bytes
+        :rtype: dict
+        :raises: PacotaoS3Exception
+        """
+        return await self.grava_bytes(path_objeto, await arquivo.read())
+
+    async def grava_bytes(self, path_objeto: str, bytes_objeto: bytes) -> dict:
+        """
+        Realiza a escrita de bytes no bucket.
+
+        :param str path_objeto: path objeto no destino
+        :param bytes bytes_objeto: bytes do objeto
+        :return: dict {objeto, tamanho}, tamanho em bytes
+        :rtype: dict
+        :raises: PacotaoS3Exception
+        """
+        try:
+            await self.__CLIENT.put_object(Bucket=self.__VOLUME, Key=path_objeto, Body=bytes_objeto)
+            return {'objeto': path_objeto, 'tamanho': len(bytes_objeto)}
+        except ClientError as e:
+            raise PacotaoS3Exception(ERRMSG_ESCRITA, e)
+
+    async def grava_b64str(self, path_objeto: str, base64str_objeto: str) -> dict:
+        """
+        Converte str b64 realiza a escrita de bytes no bucket.
+
+        :param str path_objeto: path_objeto
+        :param str base64str_objeto: str base64 do objeto
+        :return: dict {objeto, tamanho}, tamanho em bytes
+        :rtype: dict
+        :raises: PacotaoS3Exception
+        """
+        return await self.grava_bytes(path_objeto, base64str_para_bytes(base64str_objeto))
+
+    async def executar_lote(self, funcao, itens, limite: int = None):
+        """
+        Executa a corrotina `funcao` para cada item com no máximo `limite` chamadas simultâneas, retornando os
+        resultados à medida que são concluídos. Os itens são consumidos sob demanda pelos workers.
+
+        Se o consumidor parar de iterar, os workers pendentes são cancelados ao fechar o iterator.
+
+        :param callable funcao: corrotina que recebe um item e retorna um dict com a chave 'objeto'
+        :param iterable itens: itens a processar, cada item é (path_objeto, *args); iterável síncrono ou assíncrono
+        :param int limite: quantidade máxima de chamadas simultâneas
+        :returns: async iterator de dict, com a chave 'erro' (qualquer exceção) nos itens que falharam
+        :rtype: async iterator(dict)
+        """
+        limite = limite or self.__LIMITE
+        assincrono = hasattr(itens, '__aiter__')
+        itens = itens.__aiter__() if assincrono else iter(itens)
+        trava = asyncio.Lock()
+        resultados = asyncio.Queue(maxsize=2 * limite)
+        fim = object()
+
+        async def proximo():
+            if not assincrono:
+                return next(itens, fim)
+            async with trava:
+                try:
+                    return await itens.__anext__()
+                except StopAsyncIteration:
+                    return fim
+
+        async def worker():
+            try:
+                while True:
+                    item = await proximo()
+                    if item is fim:
+                        break
+                    try:
+                        resultado = await funcao(*item)
+                    except Exception as e:
+                        resultado = {'objeto': item[0], 'erro': e}
+                    await resultados.put(resultado)
+            except Exception as e:
+                await resultados.put(e)
+                return
+            await resultados.put(fim)
+
+        workers = [asyncio.create_task(worker()) for _ in range(limite)]
+        try:
+            ativos = len(workers)
+            while ativos:
+                resultado = await resultados.get()
+                if resultado is fim:
+                    ativos -= 1
+                elif isinstance(resultado, Exception):
+                    raise resultado
+                else:
+                    yield resultado
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    def download_lote(self, paths_objetos, limite: int = None):
+        """
+        Retorna os bytes de vários objetos, com concorrência limitada.
+
+        :param iterable paths_objetos: paths dos objetos
+        :param int limite: quantidade máxima de downloads simultâneos
+        :returns: async iterator de dict {objeto, bytes} ou {objeto, erro}, na ordem de conclusão
+        :rtype: async iterator(dict)
+        """
+        return self.executar_lote(self.download_bytes, ((p,) for p in paths_objetos), limite=limite)
+
+    def grava_lote(self, objetos, limite: int = None):
+        """
+        Realiza a escrita de vários objetos no bucket, com concorrência limitada.
+
+        :param iterable objetos: pares (path_objeto, bytes_objeto)
+        :param int limite: quantidade máxima de uploads simultâneos
+        :returns: async iterator de dict {objeto, tamanho} ou {objeto, erro}, na ordem de conclusão
+        :rtype: async iterator(dict)
+        """
+        return self.executar_lote(self.grava_bytes, objetos, limite=limite)
+
+    async def __stream_chunks(self, path_objeto: str, chunk_size: int):
+        """
+        Async iterator que realiza a leitura do Body de um objeto.
+
+        :param str path_objeto: path_objeto
+        :param int chunk_size: quantidade de bytes a serem lidos por iteração
+        :returns: async iterator
+        :rtype: async iterator(bytes)
+        """
+        resposta = await self.__CLIENT.get_object(Bucket=self.__VOLUME, Key=path_objeto)
+        async with resposta['Body'] as body:
+            while True:
+                chunk = await body.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    async def stream_objeto(self, path_objeto: str, chunk_size=TAMANHO_CHUNK):
+        """
+        Realiza o streamming de um objeto do bucket.
+
+        :param str path_objeto: path_objeto
+        :param int chunk_size: quantidade de bytes a serem lidos por iteração, 1 Mb por padrão
+        :return: bytes chunk do arquivo
+        :rtype: async iterator(bytes)
+        :raises: ObjetoNaoEncontradoException
+        """
+        try:
+            async for chunk in self.__stream_chunks(path_objeto, chunk_size):
+                yield chunk
+        except ClientError as e:
+            if erro_nao_encontrado(e):
+                raise ObjetoNaoEncontradoException(mensagem=f'Objeto {path_objeto} não encontrado', excecao=e)
+            raise PacotaoS3Exception(ERRMSG_LEITURA, e)
+
+    async def stream_b64str(self, path_objeto: str, chunk_size=TAMANHO_CHUNK):
+        """
+        Realiza o streamming de um objeto do bucket já codificado em str base64.
+
+        :param str path_objeto: path_objeto
+        :param int chunk_size: quantidade de bytes lidos por iteração
+        :return: chunks da str base64 do objeto
+        :rtype: async iterator(str)
+        :raises: ObjetoNaoEncontradoException
+        """
+        resto = b''
+        async for chunk in self.stream_objeto(path_objeto, chunk_size=chunk_size):
+            parte, resto = base64str_parcial(chunk, resto)
+            if parte:
+                yield parte
+        if resto:
+            yield bytes_para_base64str(resto)
+
+
+class __ModS3AsyncSingleton(__ModS3Async, metaclass=SingletonMeta):
+    pass
+
+
+class MultiArmazenamentoS3Async(__ModS3Async):
+    def __init__(self, access_key: str, secret_key: str, endpoint: str, region: str, volume: str, **kwargs):
+        super().__init__(access_key=access_key, secret_key=secret_key, endpoint=endpoint, region=region, volume=volume,
+                         **kwargs)
+
+
+class ArmazenamentoS3Async(__ModS3AsyncSingleton):
+    def __init__(self, access_key: str, secret_key: str, endpoint: str, region: str, volume: str, **kwargs):
+        super().__init__(access_key=access_key, secret_key=secret_key, endpoint=endpoint, region=region, volume=volume,
+                         **kwargs)
@@ -1,4 +1,21 @@
 import sqlite3
+import itertools
+
+from pathlib import Path
+from contextlib import contextmanager
+
+# WAL permite leituras concorrentes com a escrita; synchronous=NORMAL é seguro em WAL e evita um fsync por commit
+PERFIL_DESEMPENHO = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 268435456,
+    'cache_size': -65536,
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,
+}
+
+PRAGMAS = ('journal_mode', 'synchronous', 'mmap_size', 'cache_size', 'temp_store', 'busy_timeout', 'foreign_keys',
+           'wal_autocheckpoint', 'journal_size_limit')
 
 
 class __ModSQLite:
@@ -6,12 +23,65 @@ class __ModSQLite:
     Classe para modelar conexão e interação com banco de dados SQLite.
     """
 
-    def __init__(self, database: str):
-        self.__conn = sqlite3.connect(database=database, timeout=3)
+    def __init__(self, database: str, perfil: dict = None, somente_leitura: bool = False, timeout: float = 3,
+                 cached_statements: int = 128):
+        if somente_leitura:
+            uri = f'{Path(database).resolve().as_uri()}?mode=ro'
+            self.__conn = sqlite3.connect(database=uri, uri=True, timeout=timeout, cached_statements=cached_statements)
+        else:
+            self.__conn = sqlite3.connect(database=database, timeout=timeout, cached_statements=cached_statements)
         self.__cursor = self.__conn.cursor()
+        self.__aplicar_perfil(perfil or {}, somente_leitura)
+        self.__em_transacao = False
+
+    def __aplicar_perfil(self, perfil: dict, somente_leitura: bool):
+        """
+        Aplica os PRAGMAs do perfil na conexão. Em conexões somente leitura o journal_mode é ignorado, já que ele é
+        persistido no arquivo e só pode ser alterado por uma conexão de escrita.
+        """
+        for pragma, valor in perfil.items():
+            if pragma not in PRAGMAS:
+                raise ValueError(f'PRAGMA não suportado: {pragma}')
+            if pragma == 'journal_mode' and somente_leitura:
+                continue
+            if not isinstance(valor, int) and not str(valor).isalnum():
+                raise ValueError(f'Valor inválido para PRAGMA {pragma}: {valor}')
+            self.__cursor.execute(f'PRAGMA {pragma} = {valor};')
+
+    def pragma(self, nome: str):
+        """
+        Consulta o valor atual de um PRAGMA.
+
+        :param str nome: nome do PRAGMA
+        :return: valor
+        """
+        if nome not in PRAGMAS:
+            raise ValueError(f'PRAGMA não suportado: {nome}')
+        return self.__cursor.execute(f'PRAGMA {nome};').fetchone()[0]
 
     def __commit(self):
-        self.__conn.commit()
+        if not self.__em_transacao:
+            self.__conn.commit()
+
+    @contextmanager
+    def transacao(self):
+        """
+        Agrupa as escritas do bloco em uma única transação: commit ao final, rollback em caso de exceção.
+
+        Dentro do bloco, `execute` não efetua commit a cada comando.
+        """
+        if self.__em_transacao:
+            yield self
+            return
+        self.__em_transacao = True
+        try:
+            yield self
+            self.__conn.commit()
+        except BaseException:
+            self.__conn.rollback()
+            raise
+        finally:
+            self.__em_transacao = False
 
     def __rowcount(self) -> int:
         return self.__cursor.rowcount
@@ -21,6 +91,33 @@ class __ModSQLite:
         _ = self.__cursor.fetchall()
         return (len(_), _)
 
+    def iterar(self, *, query: str, valores: dict, lote: int = 1000, em_lotes: bool = False):
+        """
+        Executa um select e retorna os registros sob demanda, com fetchmany, em memória constante.
+
+        Usa um cursor próprio, de forma que outras consultas podem ser feitas durante a iteração.
+
+        :param str query: query parametrizada
+        :param dict valores: parâmetros
+        :param int lote: quantidade de registros por fetchmany
+        :param bool em_lotes: retorna listas de até `lote` registros em vez de registros individuais
+        :return: iterator de registros (ou de listas de registros)
+        :rtype: iterator(tuple)
+        """
+        cursor = self.__conn.cursor()
+        try:
+            cursor.execute(query, valores)
+            while True:
+                registros = cursor.fetchmany(lote)
+                if not registros:
+                    break
+                if em_lotes:
+                    yield registros
+                else:
+                    yield from registros
+        finally:
+            cursor.close()
+
     def select_one(self, *, query: str, valores: dict) -> tuple:
         self.__cursor.execute(query, valores)
         return self.__cursor.fetchone()
@@ -30,6 +127,25 @@ class __ModSQLite:
         self.__commit()
         return self.__rowcount()
 
+    def execute_many(self, *, query: str, valores, lote: int = 10000) -> int:
+        """
+        Executa `query` para cada item de `valores` com executemany, em lotes de `lote` itens e em uma única
+        transação.
+
+        :param str query: query parametrizada
+        :param iterable valores: dicts de parâmetros
+        :param int lote: quantidade de itens por executemany
+        :return: quantidade de registros escritos
+        :rtype: int
+        """
+        total = 0
+        valores = iter(valores)
+        with self.transacao():
+            for bloco in iter(lambda: list(itertools.islice(valores, lote)), []):
+                self.__cursor.executemany(query, bloco)
+                total += self.__rowcount()
+        return total
+
     def __enter__(self):
         return self
 
@@ -42,11 +158,10 @@ class __ModSQLite:
 
 
 class DatabaseSQLite(__ModSQLite):
-    def __init__(self, database: str):
-        super().__init__(database=database)
-
-
-from sqlite.sqlite import DatabaseSQLite
+    def __init__(self, database: str, perfil: dict = None, somente_leitura: bool = False, timeout: float = 3,
+                 cached_statements: int = 128):
+        super().__init__(database=database, perfil=perfil, somente_leitura=somente_leitura, timeout=timeout,
+                         cached_statements=cached_statements)
 
 
 class Queries:
@@ -60,7 +175,11 @@ class Queries:
 
     COLUNAS = ['ID', 'TIMESTAMP', 'FORMATO', 'PROCESSADO']
 
-    COUNT = """SELECT * FROM "HISTORICO;"""
+    COUNT = """SELECT * FROM "HISTORICO";"""
+
+    PAGINA = """
+             SELECT * FROM "HISTORICO" WHERE "ID" > :ultimo ORDER BY "ID" LIMIT :limite;
+             """
 
     PUT_REG = """
               INSERT INTO "HISTORICO" ("ID", "TIMESTAMP") VALUES (:identificador, :timestamp);
@@ -103,6 +222,21 @@ class Historico:
         return conn.execute(query=Queries.PUT_REG,
                             valores={'identificador': identificador, 'timestamp': timestamp})
 
+    @staticmethod
+    def put_many(conn: DatabaseSQLite, registros, lote: int = 10000) -> int:
+        """
+        Realiza o insert de vários registros em uma única transação.
+
+        :param DatabaseSQLite conn: conexão com o banco de dados
+        :param iterable registros: tuplas (identificador, timestamp)
+        :param int lote: quantidade de registros por executemany
+        :return: quantidade de registros escritos
+        :rtype: int
+        """
+        return conn.execute_many(query=Queries.PUT_REG,
+                                 valores=({'identificador': i, 'timestamp': t} for i, t in registros),
+                                 lote=lote)
+
     @staticmethod
     def update(conn: DatabaseSQLite, identificador: str, formato: str, timestamp: int) -> int:
         """
@@ -117,6 +251,21 @@ class Historico:
         return conn.execute(query=Queries.UPDATE_REG,
                             valores={'identificador': identificador, 'formato': formato, 'timestamp': timestamp})
 
+    @staticmethod
+    def update_many(conn: DatabaseSQLite, registros, lote: int = 10000) -> int:
+        """
+        Realiza o update de vários registros em uma única transação.
+
+        :param DatabaseSQLite conn: conexão com o banco de dados
+        :param iterable registros: tuplas (identificador, formato, timestamp)
+        :param int lote: quantidade de registros por executemany
+        :return: quantidade de registros escritos
+        :rtype: int
+        """
+        return conn.execute_many(query=Queries.UPDATE_REG,
+                                 valores=({'identificador': i, 'formato': f, 'timestamp': t} for i, f, t in registros),
+                                 lote=lote)
+
     @staticmethod
     def get(conn: DatabaseSQLite, identificador: str) -> tuple:
         """
@@ -152,3 +301,34 @@ class Historico:
         """
         *_, todos_registros = conn.select(query=Queries.COUNT, valores={})
         return todos_registros
+
+    @staticmethod
+    def iterar(conn: DatabaseSQLite, lote: int = 1000):
+        """
+        Recupera todos os registros (full scan) sob demanda, em memória constante.
+
+        :param DatabaseSQLite conn: conexão com o banco de dados
+        :param int lote: quantidade de registros por fetchmany
+        :return: iterator de registros
+        :rtype: iterator(tuple)
+        """
+        return conn.iterar(query=Queries.COUNT, valores={}, lote=lote)
+
+    @staticmethod
+    def show_paginado(conn: DatabaseSQLite, tamanho_pagina: int = 1000, ultimo: str = ''):
+        """
+        Recupera todos os registros em páginas ordenadas por ID (keyset pagination): cada página é uma consulta
+        independente que parte do último ID da página anterior, sem OFFSET e sem cursor aberto entre páginas.
+
+        :param DatabaseSQLite conn: conexão com o banco de dados
+        :param int tamanho_pagina: quantidade de registros por página
+        :param str ultimo: ID a partir do qual a paginação começa (exclusivo)
+        :return: iterator de páginas (listas de registros)
+        :rtype: iterator(list)
+        """
+        while True:
+            *_, pagina = conn.select(query=Queries.PAGINA, valores={'ultimo': ultimo, 'limite': tamanho_pagina})
+            if not pagina:
+                return
+            yield pagina
+            ultimo = pagina[-1][0]
@@ -39,6 +39,67 @@ def base64str_para_bytes(arquivo: str, enc='utf-8'):
     return b64decode(arquivo.encode(enc), validate=True)
 
 
+def base64str_parcial(chunk: bytes, resto: bytes = b'', enc='utf-8'):
+    """
+    Helper. Codifica em b64 o maior prefixo de `resto + chunk` com tamanho múltiplo de 3, devolvendo os bytes que
+    sobraram para serem concatenados ao próximo chunk.
+
+    :param bytes chunk: chunk de bytes
+    :param bytes resto: sobra do chunk anterior
+    :param str enc: encoding
+    :return: (str b64 do prefixo, possivelmente vazia; bytes restantes)
+    :rtype: tuple
+    """
+    if resto:
+        chunk = resto + chunk
+    corte = len(chunk) - len(chunk) % 3
+    return b64encode(chunk[:corte]).decode(enc), chunk[corte:]
+
+
+def stream_bytes_para_base64str(chunks, enc='utf-8'):
+    """
+    Helper. Converte um iterável de chunks de bytes em chunks de string b64, sem materializar o conteúdo inteiro.
+
+    Os bytes são agrupados em múltiplos de 3 (base64str_parcial), de forma que a concatenação dos chunks gerados é
+    igual a bytes_para_base64str do conteúdo completo.
+
+    :param iterable chunks: chunks de bytes
+    :param str enc: encoding
+    :return: iterator de str
+    :rtype: iterator(str)
+    """
+    resto = b''
+    for chunk in chunks:
+        parte, resto = base64str_parcial(chunk, resto, enc)
+        if parte:
+            yield parte
+    if resto:
+        yield b64encode(resto).decode(enc)
+
+
+def stream_base64str_para_bytes(chunks, enc='utf-8'):
+    """
+    Helper. Converte um iterável de chunks de string b64 em chunks de bytes, sem materializar o conteúdo inteiro.
+
+    Os caracteres são agrupados em múltiplos de 4 antes de cada decodificação.
+
+    :param iterable chunks: chunks de str base64
+    :param str enc: encoding
+    :return: iterator de bytes
+    :rtype: iterator(bytes)
+    """
+    resto = ''
+    for chunk in chunks:
+        if resto:
+            chunk = resto + chunk
+        corte = len(chunk) - len(chunk) % 4
+        resto = chunk[corte:]
+        if corte:
+            yield b64decode(chunk[:corte].encode(enc), validate=True)
+    if resto:
+        yield b64decode(resto.encode(enc), validate=True)
+
+
 def calcula_md5(base64str: str, enc='utf-8'):
     """
     Helper. Calcula a soma md5.
@@ -0,0 +1,92 @@
+import pytest
+
+fakeredis = pytest.importorskip('fakeredis')
+
+import fakeredis.aioredis  # noqa: E402
+
+from redis import BlockingConnectionPool  # noqa: E402
+
+from misc_crud.io import redis as modulo_redis  # noqa: E402
+from misc_crud.io.redis import CacheRedis, INDICE_TEMPO  # noqa: E402
+
+CONEXAO_FAKE = getattr(fakeredis, 'FakeRedisConnection', fakeredis.FakeConnection)
+
+CONEXAO_FAKE_ASYNC = getattr(fakeredis, 'FakeAsyncRedisConnection', fakeredis.aioredis.FakeConnection)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    pool = BlockingConnectionPool(connection_class=CONEXAO_FAKE, server=fakeredis.FakeServer(), decode_responses=True,
+                                  encoding='utf-8')
+    monkeypatch.setitem(modulo_redis.POOLS, ('fake', 6379, 0, None), pool)
+    cache = CacheRedis(master='fake', slaves=[], porta=6379, senha=None)
+    cache.get_roteador.cliente(modulo_redis.RoteadorLeitura.MASTER).zadd(
+        INDICE_TEMPO, {f'chave-{i}': 1000 + i for i in range(5)})
+    yield cache
+    cache.fechar()
+
+
+def test_listar_por_tempo_somente_quantidade(cache):
+    assert cache.listar_por_tempo(quantidade=2) == (('chave-0', 1000), ('chave-1', 1001))
+
+
+def test_listar_por_tempo_somente_offset(cache):
+    assert cache.listar_por_tempo(offset=3) == (('chave-3', 1003), ('chave-4', 1004))
+
+
+def test_listar_por_tempo_async_offset_ou_quantidade(monkeypatch):
+    import asyncio
+    import functools
+
+    from redis.asyncio import BlockingConnectionPool as BlockingConnectionPoolAsync
+
+    from misc_crud.io import redis_async
+    from misc_crud.io.redis_async import CacheRedisAsync
+
+    servidor = fakeredis.FakeServer()
+    monkeypatch.setattr(redis_async, 'BlockingConnectionPool',
+                        functools.partial(BlockingConnectionPoolAsync, connection_class=CONEXAO_FAKE_ASYNC,
+                                          server=servidor))
+
+    async def cenario():
+        async with CacheRedisAsync(master='fake', slaves=[], porta=6379, senha=None, health_check_interval=0) as cache:
+            await fakeredis.FakeAsyncRedis(server=servidor).zadd(INDICE_TEMPO,
+                                                                 {f'chave-{i}': 1000 + i for i in range(5)})
+            return await cache.listar_por_tempo(quantidade=2), await cache.listar_por_tempo(offset=3)
+
+    quantidade, offset = asyncio.run(cenario())
+    assert quantidade == (('chave-0', 1000), ('chave-1', 1001))
+    assert offset == (('chave-3', 1003), ('chave-4', 1004))
+
+
+def test_cache_proximo_compartilha_um_ouvinte(monkeypatch):
+    import time
+
+    servidor = fakeredis.FakeServer()
+    pool = BlockingConnectionPool(connection_class=CONEXAO_FAKE, server=servidor, decode_responses=True,
+                                  encoding='utf-8', max_connections=5)
+    monkeypatch.setitem(modulo_redis.POOLS, ('fake', 6379, 0, None), pool)
+    monkeypatch.setattr(modulo_redis, 'OUVINTES', {})
+    monkeypatch.setattr(modulo_redis.CacheProximo, 'notificacoes_habilitadas', staticmethod(lambda cliente: True))
+    caches = [CacheRedis(master='fake', slaves=[], porta=6379, senha=None, cache_proximo=True) for _ in range(3)]
+    try:
+        assert len(modulo_redis.OUVINTES) == 1
+        for cache in caches:
+            cache.get_roteador.cliente(modulo_redis.RoteadorLeitura.MASTER).set('chave', 'valor')
+            assert cache.get_reg('chave') == 'valor'
+        limite = time.monotonic() + 5
+        while any(c.get_cache.estatisticas()['entradas'] == 0 for c in caches) and time.monotonic() < limite:
+            for cache in caches:
+                cache.get_reg('chave')
+            time.sleep(0.05)
+        assert all(c.get_cache.estatisticas()['entradas'] == 1 for c in caches)
+
+        fakeredis.FakeRedis(server=servidor).publish('__keyspace@0__:chave', 'set')
+        while any(c.get_cache.estatisticas()['entradas'] for c in caches) and time.monotonic() < limite:
+            time.sleep(0.05)
+        assert all(c.get_cache.estatisticas()['entradas'] == 0 for c in caches)
+        assert all(c.get_cache.estatisticas()['invalidacoes'] >= 1 for c in caches)
+    finally:
+        for cache in caches:
+            cache.fechar()
+    assert modulo_redis.OUVINTES == {}
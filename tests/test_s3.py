@@ -0,0 +1,105 @@
+import pytest
+
+moto = pytest.importorskip('moto')
+
+from misc_crud.io.s3 import MultiArmazenamentoS3, PacotaoS3Exception  # noqa: E402
+
+VOLUME = 'testes'
+MB = 1048576
+
+
+@pytest.fixture
+def s3():
+    with moto.mock_aws():
+        armazenamento = MultiArmazenamentoS3(access_key='teste', secret_key='teste', endpoint=None,
+                                             region='us-east-1', volume=VOLUME)
+        armazenamento.get_client.create_bucket(Bucket=VOLUME)
+        yield armazenamento
+
+
+def test_grava_stream_generator_multipart(s3):
+    retorno = s3.grava_stream('grande.bin', (bytes([i]) * MB for i in range(20)))
+
+    assert retorno['tamanho'] == 20 * MB
+    metadados = s3.get_client.head_object(Bucket=VOLUME, Key='grande.bin')
+    assert metadados['ContentLength'] == 20 * MB
+    assert metadados['ETag'].strip('"').endswith('-3')
+
+
+def test_apagar_lote_reporta_erro_de_conexao(s3, monkeypatch):
+    from botocore.exceptions import EndpointConnectionError
+
+    def delete_objects(**kwargs):
+        raise EndpointConnectionError(endpoint_url='http://s3.local')
+
+    monkeypatch.setattr(s3.get_client, 'delete_objects', delete_objects)
+    retorno = s3.apagar_lote([f'obj-{i}' for i in range(1500)])
+
+    assert retorno['apagados'] == [] and retorno['total'] == 0
+    assert sorted(e['objeto'] for e in retorno['erros']) == sorted(f'obj-{i}' for i in range(1500))
+    assert {e['codigo'] for e in retorno['erros']} == {'EndpointConnectionError'}
+
+
+def test_executar_lote_cancela_pendentes_ao_fechar(s3, monkeypatch):
+    import threading
+
+    from misc_crud.io import s3 as modulo_s3
+
+    liberar = threading.Event()
+    iniciados = []
+
+    class Executor(modulo_s3.ThreadPoolExecutor):
+        def shutdown(self, *args, **kwargs):
+            liberar.set()
+            super().shutdown(*args, **kwargs)
+
+    def tarefa(path_objeto):
+        iniciados.append(path_objeto)
+        if path_objeto != '0':
+            assert liberar.wait(timeout=30)
+        return {'objeto': path_objeto}
+
+    monkeypatch.setattr(modulo_s3, 'ThreadPoolExecutor', Executor)
+    lote = s3.executar_lote(tarefa, ((str(i),) for i in range(100)), max_workers=2)
+    assert next(lote) == {'objeto': '0'}
+    lote.close()
+
+    assert set(iniciados) <= {'0', '1', '2'}
+
+
+def test_download_intervalo_vazio_e_invalido(s3):
+    s3.grava_bytes('x', b'0123456789')
+
+    assert s3.download_intervalo('x', 5, 5)['bytes'] == b''
+    assert s3.download_intervalo('x', 2, 5)['bytes'] == b'234'
+    with pytest.raises(PacotaoS3Exception):
+        s3.download_intervalo('x', 5, 4)
+    with pytest.raises(PacotaoS3Exception):
+        s3.download_intervalo('x', -1, 4)
+
+
+def test_cache_304_sem_arquivo_objeto_removido(tmp_path, monkeypatch):
+    from botocore.exceptions import ClientError
+
+    from misc_crud.io.s3 import ObjetoNaoEncontradoException
+
+    with moto.mock_aws():
+        s3 = MultiArmazenamentoS3(access_key='teste', secret_key='teste', endpoint=None, region='us-east-1',
+                                  volume=VOLUME, cache=True, cache_bytes_memoria=0, cache_diretorio=str(tmp_path),
+                                  verificar_existencia=False)
+        s3.get_client.create_bucket(Bucket=VOLUME)
+        s3.grava_bytes('x', b'0123456789')
+        assert s3.download_bytes('x')['bytes'] == b'0123456789'
+        for arquivo in tmp_path.iterdir():
+            arquivo.unlink()
+
+        respostas = iter([ClientError({'Error': {'Code': '304'}}, 'GetObject'),
+                          ClientError({'Error': {'Code': 'NoSuchKey'}}, 'GetObject')])
+
+        def get_object(**kwargs):
+            raise next(respostas)
+
+        monkeypatch.setattr(s3.get_client, 'get_object', get_object)
+        with pytest.raises(ObjetoNaoEncontradoException):
+            s3.download_bytes('x')
+        assert s3.get_cache.etag(f'{VOLUME}/x') is None
@@ -0,0 +1,118 @@
+import sqlite3
+
+import pytest
+
+from misc_crud.io import sqlite as modulo_sqlite
+from misc_crud.io.sqlite import DatabaseSQLite, Historico
+
+TABELA = 'CREATE TABLE "HISTORICO" ("ID" TEXT PRIMARY KEY, "TIMESTAMP" INTEGER, "FORMATO" TEXT, "PROCESSADO" INTEGER);'
+
+
+class ConexaoContada(sqlite3.Connection):
+    commits = 0
+
+    def commit(self):
+        ConexaoContada.commits += 1
+        super().commit()
+
+
+@pytest.fixture
+def banco(tmp_path, monkeypatch):
+    connect = sqlite3.connect
+    monkeypatch.setattr(modulo_sqlite.sqlite3, 'connect',
+                        lambda *args, **kwargs: connect(*args, factory=ConexaoContada, **kwargs))
+    monkeypatch.setattr(ConexaoContada, 'commits', 0)
+    arquivo = tmp_path / 'historico.db'
+    with DatabaseSQLite(database=str(arquivo)) as conn:
+        conn.execute(query=TABELA, valores={})
+    return arquivo
+
+
+def test_put_many_e_update_many_com_um_commit(banco):
+    with DatabaseSQLite(database=str(banco)) as conn:
+        ConexaoContada.commits = 0
+        assert Historico.put_many(conn, ((f'id-{i}', i) for i in range(25)), lote=10) == 25
+        assert ConexaoContada.commits == 1
+        assert Historico.update_many(conn, ((f'id-{i}', 'pdf', i + 100) for i in range(25)), lote=10) == 25
+        assert ConexaoContada.commits == 2
+        assert Historico.get(conn, 'id-7') == ('id-7', 7, 'pdf', 107)
+
+
+def test_put_many_rollback_em_integrity_error(banco):
+    registros = [(f'id-{i}', i) for i in range(15)] + [('id-3', 99)] + [(f'id-{i}', i) for i in range(15, 20)]
+    with DatabaseSQLite(database=str(banco)) as conn:
+        with pytest.raises(sqlite3.IntegrityError):
+            Historico.put_many(conn, registros, lote=10)
+        assert Historico.show(conn) == []
+
+
+def test_transacao_aninhada_nao_faz_commit_antecipado(banco):
+    with DatabaseSQLite(database=str(banco)) as conn:
+        ConexaoContada.commits = 0
+        with pytest.raises(RuntimeError):
+            with conn.transacao():
+                Historico.put(conn, 'externo', 1)
+                with conn.transacao():
+                    Historico.put(conn, 'interno', 2)
+                assert ConexaoContada.commits == 0
+                raise RuntimeError('falha depois do bloco interno')
+        assert ConexaoContada.commits == 0
+        assert Historico.show(conn) == []
+
+
+def test_perfil_rejeita_pragma_e_valor_invalidos(banco):
+    with pytest.raises(ValueError):
+        DatabaseSQLite(database=str(banco), perfil={'user_version': 1})
+    with pytest.raises(ValueError):
+        DatabaseSQLite(database=str(banco), perfil={'journal_mode': 'WAL; DROP TABLE "HISTORICO"'})
+    with DatabaseSQLite(database=str(banco)) as conn:
+        with pytest.raises(ValueError):
+            conn.pragma('user_version')
+        assert Historico.show(conn) == []
+
+
+def test_perfil_desempenho(banco):
+    with DatabaseSQLite(database=str(banco), perfil=modulo_sqlite.PERFIL_DESEMPENHO) as conn:
+        assert conn.pragma('journal_mode') == 'wal'
+        assert conn.pragma('synchronous') == 1
+        assert conn.pragma('busy_timeout') == 5000
+
+
+def test_somente_leitura_nao_escreve(banco):
+    with DatabaseSQLite(database=str(banco)) as conn:
+        Historico.put(conn, 'id-1', 1)
+    with DatabaseSQLite(database=str(banco), perfil=modulo_sqlite.PERFIL_DESEMPENHO, somente_leitura=True) as conn:
+        assert Historico.get(conn, 'id-1') == ('id-1', 1, None, None)
+        with pytest.raises(sqlite3.OperationalError):
+            Historico.put(conn, 'id-2', 2)
+
+
+@pytest.mark.parametrize('nome', ['a?b.db', 'a#b.db', 'a%20b.db', 'dir?x#y%z/historico.db'])
+def test_somente_leitura_path_com_caracteres_de_uri(tmp_path, nome):
+    arquivo = tmp_path / nome
+    arquivo.parent.mkdir(exist_ok=True)
+    with DatabaseSQLite(database=str(arquivo)) as conn:
+        conn.execute(query=TABELA, valores={})
+        Historico.put(conn, nome, 1)
+    with DatabaseSQLite(database=str(arquivo), somente_leitura=True) as conn:
+        assert Historico.show(conn) == [(nome, 1, None, None)]
+    assert {p.name for p in arquivo.parent.iterdir()} == {arquivo.name}
+
+
+def test_show_paginado_retorna_cada_registro_uma_vez(banco):
+    with DatabaseSQLite(database=str(banco)) as conn:
+        Historico.put_many(conn, ((f'id-{i:03d}', i) for i in range(25)))
+        paginas = list(Historico.show_paginado(conn, tamanho_pagina=10))
+        assert [len(p) for p in paginas] == [10, 10, 5]
+        assert [r[0] for p in paginas for r in p] == [f'id-{i:03d}' for i in range(25)]
+        assert [r[0] for p in Historico.show_paginado(conn, tamanho_pagina=10, ultimo='id-019') for r in p] == \
+            [f'id-{i:03d}' for i in range(20, 25)]
+
+
+def test_iterar_em_lotes(banco):
+    with DatabaseSQLite(database=str(banco)) as conn:
+        Historico.put_many(conn, ((f'id-{i:03d}', i) for i in range(25)))
+        lotes = list(conn.iterar(query=modulo_sqlite.Queries.COUNT, valores={}, lote=10, em_lotes=True))
+        assert [len(lote) for lote in lotes] == [10, 10, 5]
+        assert sorted(r[0] for lote in lotes for r in lote) == [f'id-{i:03d}' for i in range(25)]
+        assert len(list(Historico.iterar(conn, lote=7))) == 25